@@ -0,0 +1,32 @@
+"""Custom authentication."""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.routers import primary_reads
+from users.snapshots import get_user_snapshot, store_user_snapshot
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that resolves users from a short-lived cache.
+
+    Snapshots are dropped whenever a user is saved or deleted, so role
+    and active flag changes apply to the next request. Missed users are
+    read from the primary, so a lagging replica is never cached.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        user = get_user_snapshot(user_id)
+        if user is None:
+            with primary_reads():
+                user = super().get_user(validated_token)
+            store_user_snapshot(user)
+        return user
@@ -0,0 +1,333 @@
+"""Suggest indexes for the list queries of the API from their plans."""
+
+import json
+import os
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection, migrations, models
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.db.models.expressions import Col
+from django.db.models.lookups import Lookup
+from django.db.models.sql.where import AND, WhereNode
+from django.http import Http404
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from api.v1.urls import router_v1
+from reviews.models import Category, Comment, Genre, Title
+
+EQUALITY_LOOKUPS = {"exact", "in"}
+RANGE_LOOKUPS = {"gt", "gte", "lt", "lte", "range"}
+PATTERN_LOOKUPS = {"contains", "icontains", "startswith", "istartswith"}
+PARTIAL_LOOKUPS = {"isnull"}
+
+# Representative query strings of the list endpoints, by router basename.
+PROBES = {
+    "categories": ({}, {"search": "{category_name}"}),
+    "genres": ({}, {"search": "{genre_name}"}),
+    "titles": (
+        {},
+        {"genre": "{genre}"},
+        {"category": "{category}", "year_min": "2000", "year_max": "2010"},
+        {"year": "2000"},
+        {"name": "{title_name}"},
+    ),
+    "reviews": ({}, {"pagination": "cursor"}),
+    "comments": ({}, {"pagination": "cursor"}),
+    "users": ({}, {"search": "user"}),
+}
+
+SQLITE_SCAN = re.compile(r"\bSCAN (\w+)")
+
+
+def samples():
+    """Values of real rows to fill the probes and URL arguments with."""
+    title = Title.objects.order_by("-rating_count").first()
+    comment = (
+        Comment.objects.order_by("-pk")
+        .values("review_id", "review__title_id")
+        .first()
+    )
+    category = Category.objects.first()
+    genre = Genre.objects.first()
+    return {
+        "title_id": title.pk if title else 0,
+        "title_name": title.name[:3] if title else "",
+        "comment_title_id": comment["review__title_id"] if comment else 0,
+        "review_id": comment["review_id"] if comment else 0,
+        "category": category.slug if category else "",
+        "category_name": category.name[:3] if category else "",
+        "genre": genre.slug if genre else "",
+        "genre_name": genre.name[:3] if genre else "",
+    }
+
+
+def view_kwargs(basename, values):
+    if basename == "reviews":
+        return {"title_id": values["title_id"]}
+    if basename == "comments":
+        return {
+            "title_id": values["comment_title_id"],
+            "review_id": values["review_id"],
+        }
+    return {}
+
+
+def list_queryset(viewset, basename, params, values):
+    """The queryset of a page of the 'list' action for the parameters."""
+    kwargs = view_kwargs(basename, values)
+    view = viewset(
+        action_map={"get": "list"},
+        action="list",
+        args=(),
+        kwargs=kwargs,
+        format_kwarg=None,
+    )
+    view.request = view.initialize_request(
+        APIRequestFactory().get("/", params)
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    if paginator is None:
+        return queryset
+    mode = getattr(paginator, "mode_query_param", None)
+    if mode and params.get(mode) == paginator.cursor_mode:
+        paginator = paginator.cursor_pagination_class()
+    ordering = getattr(paginator, "ordering", None)
+    if ordering:
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        queryset = queryset.order_by(*ordering)
+    return queryset[: paginator.page_size or api_settings.PAGE_SIZE]
+
+
+def base_lookups(query):
+    """Lookups on the base table of the query joined by AND."""
+    nodes = [query.where]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, WhereNode):
+            if node.connector == AND and not node.negated:
+                nodes.extend(node.children)
+        elif (
+            isinstance(node, Lookup)
+            and isinstance(node.lhs, Col)
+            and node.lhs.alias == query.base_table
+        ):
+            yield node
+
+
+def ordering_fields(queryset):
+    query = queryset.query
+    ordering = query.order_by or (
+        query.default_ordering and queryset.model._meta.ordering
+    ) or ()
+    fields = []
+    for name in ordering:
+        if not isinstance(name, str) or "__" in name.lstrip("-"):
+            break
+        field = name.lstrip("-")
+        if field == "pk":
+            field = queryset.model._meta.pk.name
+        fields.append(("-" if name.startswith("-") else "") + field)
+    return fields
+
+
+def wanted_index(queryset):
+    """Fields, partial condition and pattern fields the query filters on."""
+    equality, ranges, condition, patterns = [], [], {}, []
+    for lookup in base_lookups(queryset.query):
+        field = lookup.lhs.target
+        if lookup.lookup_name in PARTIAL_LOOKUPS or (
+            lookup.lookup_name == "exact"
+            and isinstance(field, models.BooleanField)
+        ):
+            condition[f"{field.name}__{lookup.lookup_name}"] = lookup.rhs
+        elif lookup.lookup_name in EQUALITY_LOOKUPS:
+            equality.append(field.name)
+        elif lookup.lookup_name in RANGE_LOOKUPS:
+            ranges.append(field.name)
+        elif lookup.lookup_name in PATTERN_LOOKUPS:
+            patterns.append(field.name)
+    fields = list(dict.fromkeys(equality))
+    ordering = [
+        name for name in ordering_fields(queryset)
+        if name.lstrip("-") not in fields
+    ]
+    # One range column can follow the equalities if nothing is sorted.
+    fields += ordering or ranges[:1]
+    return fields, condition, patterns
+
+
+def plan_problems(queryset):
+    """Full scans and sorts of the query plan, by table."""
+    scans, sort = set(), False
+    if connection.vendor == "postgresql":
+        nodes = [json.loads(queryset.explain(format="json"))[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", ()))
+            node_type = node["Node Type"]
+            if node_type == "Seq Scan" or (
+                node_type in {"Index Scan", "Index Only Scan"}
+                and "Index Cond" not in node
+                and "Filter" in node
+            ):
+                scans.add(node["Relation Name"])
+            elif node_type in {"Sort", "Incremental Sort"}:
+                sort = True
+    else:
+        plan = queryset.explain()
+        scans.update(SQLITE_SCAN.findall(plan))
+        sort = "TEMP B-TREE" in plan
+    return scans, sort
+
+
+def table_rows(table):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                (table,),
+            )
+        else:
+            cursor.execute(
+                f"SELECT count(*) FROM {connection.ops.quote_name(table)}"
+            )
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def existing_indexes(table):
+    """Column lists of the indexes of the table, as the database has them."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        constraint["columns"]
+        for constraint in constraints.values()
+        if constraint["index"] or constraint["unique"]
+        or constraint["primary_key"]
+    ]
+
+
+def is_covered(model, fields, indexes):
+    columns = [
+        model._meta.get_field(name.lstrip("-")).column for name in fields
+    ]
+    return any(index[: len(columns)] == columns for index in indexes)
+
+
+def describe(model, index):
+    condition = f" where {index.condition}" if index.condition else ""
+    return f"{model._meta.db_table} {index.fields}{condition}"
+
+
+class Command(BaseCommand):
+    """EXPLAIN the list queries of every viewset and suggest indexes."""
+
+    help = (
+        "Run the list querysets of the API viewsets under EXPLAIN, report "
+        "full scans and sorts of large tables and suggest indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Tables with fewer rows are not worth an index.",
+        )
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help="Write the suggested indexes as migrations.",
+        )
+
+    def handle(self, *args, **options):
+        values = samples()
+        suggestions = {}
+        for _, viewset, basename in router_v1.registry:
+            for params in PROBES.get(basename, ({},)):
+                params = {
+                    name: value.format(**values)
+                    for name, value in params.items()
+                }
+                label = f"{basename} {json.dumps(params, ensure_ascii=False)}"
+                try:
+                    queryset = list_queryset(
+                        viewset, basename, params, values
+                    )
+                except Http404:
+                    self.stdout.write(f"{label}: skipped, no sample rows")
+                    continue
+                index, notes = self.advise(queryset, options["min_rows"])
+                if index is None:
+                    self.stdout.write(f"{label}: ok")
+                else:
+                    key = describe(queryset.model, index)
+                    self.stdout.write(f"{label}: suggest {key}")
+                    suggestions.setdefault(key, (queryset.model, index))
+                for note in notes:
+                    self.stdout.write(f"  {note}")
+        if options["write"] and suggestions:
+            self.write_migrations(suggestions.values())
+
+    def advise(self, queryset, min_rows):
+        """Index for the query if its plan is poor on a large table."""
+        model = queryset.model
+        table = model._meta.db_table
+        scans, sort = plan_problems(queryset)
+        if table not in scans and not sort or table_rows(table) < min_rows:
+            return None, []
+        fields, condition, patterns = wanted_index(queryset)
+        notes = []
+        if patterns and table in scans:
+            notes.append(
+                f"'{table}' is scanned for a pattern match on {patterns}, "
+                "a trigram GIN index would serve it."
+            )
+        if not fields or (
+            not condition
+            and is_covered(model, fields, existing_indexes(table))
+        ):
+            return None, notes
+        index = models.Index(fields=fields)
+        index.set_name_with_model(model)
+        # A partial index needs its name when built, the name is made from
+        # the fields alone.
+        if condition:
+            index = models.Index(
+                fields=fields,
+                name=index.name,
+                condition=models.Q(**condition),
+            )
+        return index, notes
+
+    def write_migrations(self, suggestions):
+        loader = MigrationLoader(connection)
+        by_app = {}
+        for model, index in suggestions:
+            by_app.setdefault(model._meta.app_label, []).append(
+                migrations.AddIndex(
+                    model_name=model._meta.model_name, index=index
+                )
+            )
+        for app_label, operations in by_app.items():
+            leaf = max(loader.graph.leaf_nodes(app_label))
+            number = int(leaf[1].split("_")[0]) + 1
+            migration = migrations.Migration(
+                f"{number:04d}_advised_indexes", app_label
+            )
+            migration.dependencies = [leaf]
+            migration.operations = operations
+            writer = MigrationWriter(migration)
+            os.makedirs(os.path.dirname(writer.path), exist_ok=True)
+            with open(writer.path, "w", encoding="utf-8") as migration_file:
+                migration_file.write(writer.as_string())
+            self.stdout.write(
+                f"Migration '{writer.path}' written for "
+                f"'{apps.get_app_config(app_label).verbose_name}'."
+            )
@@ -0,0 +1,137 @@
+"""Request middleware: SQL instrumentation, replica routing, compression."""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import GZipMiddleware
+from rest_framework.permissions import SAFE_METHODS
+
+from api.queries import QueryRecorder, fingerprint_digest
+from api_yamdb.routers import RequestRouting, routing
+
+PIN_COOKIE = "pin_primary"
+
+logger = logging.getLogger("api.sql")
+
+
+class QueryInstrumentationMiddleware:
+    """Report the SQL statements of every request.
+
+    The query count, database time and fingerprints repeated more than
+    'SQL_REPEATED_QUERY_THRESHOLD' times are added to the response
+    headers and logged to 'api.sql'. Repeated fingerprints are logged as
+    warnings since they usually mean an N+1 in the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.SQL_REPEATED_QUERY_THRESHOLD
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        repeated = recorder.repeated(self.threshold)
+        db_time = round(recorder.duration * 1000, 2)
+        response["X-DB-Query-Count"] = str(recorder.count)
+        response["X-DB-Time-Ms"] = str(db_time)
+        if repeated:
+            response["X-DB-Repeated-Queries"] = ", ".join(
+                f"{fingerprint_digest(shape)};count={number}"
+                for shape, number in repeated
+            )
+        match = request.resolver_match
+        record = {
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_time_ms": db_time,
+            "repeated": {
+                fingerprint_digest(shape): number
+                for shape, number in repeated
+            },
+        }
+        logger.info(
+            "%(method)s %(path)s %(status)s: %(queries)s queries, "
+            "%(db_time_ms)s ms",
+            record,
+            extra={"sql": record},
+        )
+        for shape, number in repeated:
+            logger.warning(
+                "Possible N+1 in %s: statement executed %s times: %s",
+                record["view"] or request.path,
+                number,
+                shape,
+                extra={
+                    "sql": dict(
+                        record,
+                        fingerprint=fingerprint_digest(shape),
+                        statement=shape,
+                        count=number,
+                    )
+                },
+            )
+        return response
+
+
+def pin_key(request):
+    """Cache key pinning the client of the token to the primary."""
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if not authorization:
+        return None
+    return f"pin:{hashlib.md5(authorization.encode()).hexdigest()}"
+
+
+class ReplicaRoutingMiddleware:
+    """Let safe requests read from the replicas of 'DB_REPLICAS'.
+
+    A successful unsafe request pins its client to the primary for
+    'DB_PIN_SECONDS': clients with a token by a cache entry of the
+    token, the others by a cookie. Pinned clients read their own writes
+    even while the replicas lag behind.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DB_REPLICAS:
+            return self.get_response(request)
+        key = pin_key(request)
+        safe = request.method in SAFE_METHODS
+        pinned = (
+            not safe
+            or PIN_COOKIE in request.COOKIES
+            or (key is not None and cache.get(key) is not None)
+        )
+        token = routing.set(RequestRouting(use_replica=not pinned))
+        try:
+            response = self.get_response(request)
+        finally:
+            routing.reset(token)
+        if not safe and response.status_code < 400:
+            if key is not None:
+                cache.set(key, True, settings.DB_PIN_SECONDS)
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=settings.DB_PIN_SECONDS, httponly=True
+            )
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Gzip responses of at least 'RESPONSE_COMPRESSION_MIN_SIZE' bytes.
+
+    Smaller responses gain too little to pay for the compression.
+    """
+
+    def process_response(self, request, response):
+        if (
+            not response.streaming
+            and len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE
+        ):
+            return response
+        return super().process_response(request, response)
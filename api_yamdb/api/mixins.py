@@ -1,6 +1,20 @@
 """Custom viewsets."""
 
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+from reviews.versions import (
+    get_state,
+    get_version,
+    state_keys,
+    version_key,
+)
+
+from api_yamdb.routers import primary_reads
 
 
 class CreateListDeleteViewSet(
@@ -16,3 +30,168 @@ class ModelViewSetWithoutPUT(viewsets.ModelViewSet):
     """The viewset allows all methods except PUT."""
 
     http_method_names = ("get", "post", "patch", "delete", "head", "options")
+
+
+class VersionedResponseCacheMixin:
+    """Caches 'list' and 'retrieve' responses until the version changes.
+
+    Responses are keyed by the full path with the query string and by the
+    accepted media type. The entry stores the version it was built for,
+    so a read is a single 'get_many' of the entry and the current version.
+    A missed entry is built from the primary, a lagging replica would
+    store old data under the current version.
+    """
+
+    cache_version_name = None
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def get_response_cache_key(self, request):
+        digest = hashlib.md5(
+            f"{request.get_full_path()}|{request.accepted_media_type}".encode()
+        ).hexdigest()
+        return f"response:{self.cache_version_name}:{digest}"
+
+    def get_response_cache_keys(self, request):
+        """Keys of the response entry and of the version it must match."""
+        return (
+            self.get_response_cache_key(request),
+            version_key(self.cache_version_name),
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key, current_key = self.get_response_cache_keys(request)
+        if {key, current_key} <= getattr(self, "prefetched_keys", set()):
+            cached = self.prefetched
+        else:
+            cached = cache.get_many((key, current_key))
+        version = cached.get(current_key)
+        if version is None:
+            version = get_version(self.cache_version_name)
+        entry = cached.get(key)
+        if entry is not None and entry[0] == version:
+            return Response(entry[1], status=status.HTTP_200_OK)
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, (version, response.data), self.cache_timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class NotModifiedError(Exception):
+    """The client copy of the resource is fresh."""
+
+
+class ConditionalGetMixin:
+    """Answers reads with 304 if the client copy is fresh.
+
+    Only the actions of 'conditional_actions' are checked.
+
+    The strong ETag and Last-Modified come from the change counters
+    named by 'get_condition_names' and are checked after authentication
+    and permissions, so a fresh copy costs no queries and no
+    serialization.
+    """
+
+    conditional_actions = ("list", "retrieve")
+
+    def get_condition_names(self):
+        raise NotImplementedError(
+            "'get_condition_names' must return change counter names."
+        )
+
+    def get_prefetched_keys(self, request):
+        """Other cache keys of the action, read with the change counters.
+
+        The entries are kept in 'prefetched'.
+        """
+        return ()
+
+    def get_etag(self, request, versions):
+        digest = hashlib.md5(
+            f"{versions}|{request.get_full_path()}|"
+            f"{request.accepted_media_type}".encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def get_if_none_match(self, request):
+        """ETags of 'If-None-Match' in the strong form, 'None' if absent."""
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match is None:
+            return None
+        # Compressed responses carry the weak form of the ETag.
+        return {
+            tag[2:] if tag.startswith("W/") else tag
+            for tag in parse_etags(if_none_match)
+        }
+
+    def is_not_modified(self, request, etag, last_modified):
+        etags = self.get_if_none_match(request)
+        if etags is not None:
+            return etag in etags
+        if_modified_since = parse_http_date_safe(
+            request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+        )
+        return (
+            if_modified_since is not None
+            and last_modified is not None
+            and int(last_modified) <= if_modified_since
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.condition = None
+        self.match_any = False
+        names = ()
+        if self.action in self.conditional_actions:
+            names = self.get_condition_names()
+        # One shared cache read for the request.
+        self.prefetched_keys = {
+            *state_keys(names),
+            *self.get_prefetched_keys(request),
+        }
+        self.prefetched = (
+            cache.get_many(list(self.prefetched_keys))
+            if self.prefetched_keys
+            else {}
+        )
+        if not names:
+            return
+        versions, last_modified = get_state(names, self.prefetched)
+        self.condition = (self.get_etag(request, versions), last_modified)
+        if self.is_not_modified(request, *self.condition):
+            raise NotModifiedError
+        # 'If-None-Match: *' matches any copy, known once the resource
+        # is found.
+        self.match_any = "*" in (self.get_if_none_match(request) or ())
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModifiedError):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            getattr(self, "match_any", False)
+            and response.status_code == status.HTTP_200_OK
+        ):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, "condition", None) and response.status_code in {
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        }:
+            etag, last_modified = self.condition
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
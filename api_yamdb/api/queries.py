@@ -0,0 +1,90 @@
+"""Recording of the SQL statements executed by a block of code."""
+
+import hashlib
+import re
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from functools import partial
+
+from django.db import connections
+
+RecordedQuery = namedtuple(
+    "RecordedQuery", ("alias", "sql", "fingerprint", "duration")
+)
+
+LITERALS = re.compile(
+    r"'(?:[^']|'')*'"  # strings
+    r"|\b\d+(?:\.\d+)?\b"  # numbers
+    r"|%s|\?"  # placeholders
+)
+IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Statement shape: literals, placeholders and 'IN' lists collapsed."""
+    shape = LITERALS.sub("?", sql)
+    shape = IN_LISTS.sub("(...)", shape)
+    return SPACES.sub(" ", shape).strip()
+
+
+def fingerprint_digest(shape):
+    """Short stable identifier of a fingerprint for headers and logs."""
+    return hashlib.md5(shape.encode()).hexdigest()[:8]
+
+
+class QueryRecorder:
+    """Record statements of every database connection inside the block.
+
+    Unlike 'CaptureQueriesContext' it works without 'DEBUG' and does not
+    keep the SQL of the whole process in 'connection.queries'.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            wrapper = partial(self._record, alias)
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(wrapper)
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def _record(self, alias, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                RecordedQuery(
+                    alias,
+                    sql,
+                    fingerprint(sql),
+                    time.perf_counter() - started,
+                )
+            )
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        """Total time spent in the database, seconds."""
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self, threshold):
+        """Fingerprints executed more than 'threshold' times, most first."""
+        counts = Counter(query.fingerprint for query in self.queries)
+        return [
+            (shape, number)
+            for shape, number in counts.most_common()
+            if number > threshold
+        ]
@@ -1,17 +1,74 @@
 """Custom filters."""
 
 import django_filters
-from django_filters import CharFilter
-from reviews.models import Title
+from django_filters import CharFilter, NumberFilter
+from reviews.models import Title, TitleRank
+from reviews.references import categories, genres
+from reviews.search import search_titles
 
 
-class TitleFilter(django_filters.FilterSet):
+def split_slugs(value):
+    """Slugs of a comma separated query parameter."""
+    return {slug.strip() for slug in value.split(",") if slug.strip()}
+
+
+class CatalogueFilter(django_filters.FilterSet):
+    """Category, genre and year filters of the catalogue.
+
+    'genre' keeps the titles of every listed genre, 'genre_any' of at
+    least one, 'category' of any listed category; slugs are comma
+    separated. Slugs are resolved by the per process copies of the
+    reference tables and genres are matched against the 'genre_ids'
+    column, so no joins are made.
+    """
+
+    category = CharFilter(method="filter_category")
+    genre = CharFilter(method="filter_genre")
+    genre_any = CharFilter(method="filter_genre")
+    year_min = NumberFilter(field_name="year", lookup_expr="gte")
+    year_max = NumberFilter(field_name="year", lookup_expr="lte")
+
+    class Meta:
+        fields = (
+            "category",
+            "genre",
+            "genre_any",
+            "year",
+            "year_min",
+            "year_max",
+        )
+
+    def filter_category(self, queryset, name, value):
+        ids = categories.ids(split_slugs(value)).values()
+        return queryset.filter(category_id__in=ids)
+
+    def filter_genre(self, queryset, name, value):
+        slugs = split_slugs(value)
+        ids = list(genres.ids(slugs).values())
+        if name == "genre_any":
+            return queryset.filter(genre_ids__contains_any=ids)
+        if len(ids) < len(slugs):
+            return queryset.none()
+        return queryset.filter(genre_ids__contains_all=ids)
+
+
+class TitleFilter(CatalogueFilter):
     """'Title' resource content display filter."""
 
     name = CharFilter(lookup_expr="icontains")
-    category = CharFilter(field_name="category__slug")
-    genre = CharFilter(field_name="genre__slug")
+    search = CharFilter(method="filter_search")
 
     class Meta:
         model = Title
-        fields = ("name", "category", "genre", "year")
+        fields = ("name", *CatalogueFilter.Meta.fields, "search")
+
+    def filter_search(self, queryset, name, value):
+        """Ranked full-text and typo-tolerant search of titles."""
+        return search_titles(queryset, value)
+
+
+class TopTitleFilter(CatalogueFilter):
+    """Filter of the top titles, made on the columns of their ranks."""
+
+    class Meta(CatalogueFilter.Meta):
+        model = TitleRank
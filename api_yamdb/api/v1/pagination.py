@@ -0,0 +1,35 @@
+"""Custom paginations."""
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Keyset pagination over the '(pub_date, id)' ordering."""
+
+    ordering = ("pub_date", "id")
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """Page number pagination, keyset pagination on '?pagination=cursor'.
+
+    Cursor pages skip the 'COUNT(*)' and the OFFSET scan, so a deep page
+    costs the same as the first one.
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_pagination_class = PubDateCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if request.query_params.get(self.mode_query_param) == self.cursor_mode:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -3,9 +3,23 @@
 import re
 
 from django.conf import settings
+from django.db import IntegrityError, connection, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.settings import api_settings
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRank,
+    TitleStats,
+)
+from reviews.references import categories, genres
+from reviews.search import update_search_index
+from reviews.validators import validate_year
+from reviews.versions import CATALOGUE, bump_version
 from users.models import User
 
 
@@ -32,11 +46,55 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+def represent_reference(row):
+    return {"name": row.name, "slug": row.slug}
+
+
+class ReferenceField(serializers.Field):
+    """Name and slug of a category, or of a list of genres, by id.
+
+    Rows come from the per process copy, lists are shown in the model
+    ordering as 'GenreSerializer(many=True)' shows them.
+    """
+
+    def __init__(self, references, **kwargs):
+        self.references = references
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if isinstance(value, list):
+            return [
+                represent_reference(row)
+                for row in self.references.ordered(value)
+            ]
+        row = self.references.get(value)
+        return None if row is None else represent_reference(row)
+
+
+class ReferenceSlugField(serializers.SlugRelatedField):
+    """Category or genre by slug, looked up in the per process copy."""
+
+    def __init__(self, references, **kwargs):
+        self.references = references
+        kwargs["slug_field"] = "slug"
+        kwargs.setdefault("queryset", references.model.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        row = self.references.by_slug(data) if isinstance(data, str) else None
+        if row is None:
+            self.fail(
+                "does_not_exist", slug_name=self.slug_field, value=str(data)
+            )
+        return row
+
+
 class TitleSerializerRead(serializers.ModelSerializer):
     """Serializer for requests 'GET' to endpoints of Titles resource."""
 
-    genre = GenreSerializer(many=True, read_only=True)
-    category = CategorySerializer(read_only=True)
+    genre = ReferenceField(genres, source="genre_ids")
+    category = ReferenceField(categories, source="category_id")
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -52,15 +110,114 @@ class TitleSerializerRead(serializers.ModelSerializer):
         model = Title
 
 
+TITLE_ROW_FIELDS = (
+    "id",
+    "name",
+    "year",
+    "rating_sum",
+    "rating_count",
+    "description",
+    "category_id",
+    "genre_ids",
+)
+
+
+def title_rows(queryset):
+    """Plain tuples of the title columns 'TitleSerializerRead' shows."""
+    return queryset.prefetch_related(None).values_list(*TITLE_ROW_FIELDS)
+
+
+def represent_title_rows(rows):
+    """'TitleSerializerRead' data of 'title_rows', built without fields.
+
+    Categories and genres come from the per process copies, so no query
+    is made. The result renders to the same JSON as the serializer does.
+    """
+    data = []
+    for (
+        title_id,
+        name,
+        year,
+        rating_sum,
+        rating_count,
+        description,
+        category_id,
+        genre_ids,
+    ) in rows:
+        category = None if category_id is None else categories.get(
+            category_id
+        )
+        data.append(
+            {
+                "id": title_id,
+                "name": name,
+                "year": year,
+                "rating": (
+                    int(rating_sum / rating_count) if rating_count else None
+                ),
+                "description": description,
+                "genre": [
+                    represent_reference(genre)
+                    for genre in genres.ordered(genre_ids)
+                ],
+                "category": (
+                    None if category is None
+                    else represent_reference(category)
+                ),
+            }
+        )
+    return data
+
+
+# Columns of 'TITLE_ROW_FIELDS' copied into the ranks of the titles
+TITLE_RANK_COLUMNS = {
+    "id": "title_id",
+    "category_id": "category_id",
+    "genre_ids": "genre_ids",
+}
+
+
+def top_title_rows(queryset):
+    """Rows of 'title_rows' led by the score, of a 'TitleRank' queryset."""
+    return queryset.values_list(
+        "score",
+        *(
+            TITLE_RANK_COLUMNS.get(field, f"title__{field}")
+            for field in TITLE_ROW_FIELDS
+        ),
+    )
+
+
+def represent_top_title_rows(rows):
+    """'represent_title_rows' data with the ranking score of the title."""
+    rows = list(rows)
+    data = represent_title_rows(row[1:] for row in rows)
+    for row, title in zip(rows, data):
+        title["score"] = round(row[0], 2)
+    return data
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Serializer for requests 'GET' to the statistics of a title."""
+
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ("title", "count", "mean", "median", "histogram")
+        model = TitleStats
+
+    def get_histogram(self, obj):
+        return {str(score): number for score, number in obj.histogram.items()}
+
+
 class TitleSerializerWrite(serializers.ModelSerializer):
     """Serializer for requests (excl 'GET') to 'Titles' resource endpoints."""
 
-    genre = serializers.SlugRelatedField(
-        slug_field="slug", queryset=Genre.objects.all(), many=True
-    )
-    category = serializers.SlugRelatedField(
-        slug_field="slug", queryset=Category.objects.all()
-    )
+    genre = ReferenceSlugField(genres, many=True)
+    category = ReferenceSlugField(categories)
 
     class Meta:
         fields = (
@@ -74,6 +231,201 @@ class TitleSerializerWrite(serializers.ModelSerializer):
         model = Title
 
 
+class TitleBulkSerializer(serializers.ListSerializer):
+    """Creates or updates a list of titles with a fixed number of queries.
+
+    Genre and category slugs of all items are resolved by the per process
+    copies of the reference tables, titles and genre links are written
+    with bulk operations in one transaction. Errors are reported per item,
+    nothing is written if any item is invalid.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        if len(data) > settings.BULK_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "No more than "
+                        f"{settings.BULK_MAX_ITEMS} items are allowed."
+                    ]
+                }
+            )
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except ValidationError as exc:
+                errors.append(exc.detail)
+        genre_ids, category_ids, existing = self._lookup(items)
+        # Items that passed the field validation get their slug errors.
+        slug_errors = (
+            self._item_errors(item, genre_ids, category_ids, existing)
+            for item in items
+        )
+        errors = [error or next(slug_errors) for error in errors]
+        if any(errors):
+            raise ValidationError(errors)
+        for item in items:
+            if "genre_slugs" in item:
+                item["genre_ids"] = [
+                    genre_ids[slug] for slug in item["genre_slugs"]
+                ]
+            if "category_slug" in item:
+                item["category_id"] = category_ids[item["category_slug"]]
+        return items
+
+    def _lookup(self, items):
+        """Ids of all referenced genres, categories and (PATCH) titles."""
+        genre_ids = genres.ids(
+            {slug for item in items for slug in item.get("genre_slugs", ())}
+        )
+        category_ids = categories.ids(
+            {
+                item["category_slug"]
+                for item in items
+                if "category_slug" in item
+            }
+        )
+        existing = set()
+        if self.partial:
+            existing = set(
+                Title.objects.filter(
+                    pk__in={item.get("id") for item in items}
+                ).values_list("pk", flat=True)
+            )
+        return genre_ids, category_ids, existing
+
+    def _item_errors(self, item, genre_ids, category_ids, existing):
+        errors = {}
+        if self.partial and item.get("id") not in existing:
+            errors["id"] = ["Title with this id does not exist."]
+        missing = [
+            slug
+            for slug in item.get("genre_slugs", ())
+            if slug not in genre_ids
+        ]
+        if missing:
+            errors["genre"] = [
+                f"Object with slug={slug} does not exist." for slug in missing
+            ]
+        if (
+            "category_slug" in item
+            and item["category_slug"] not in category_ids
+        ):
+            errors["category"] = [
+                f"Object with slug={item['category_slug']} does not exist."
+            ]
+        return errors
+
+    def _link_genres(self, titles, items):
+        through = Title.genre.through
+        through.objects.bulk_create(
+            (
+                through(title_id=title.pk, genre_id=genre_id)
+                for title, item in zip(titles, items)
+                for genre_id in item.get("genre_ids", ())
+            ),
+            batch_size=settings.BULK_BATCH_SIZE,
+        )
+
+    def create(self, validated_data):
+        titles = [
+            Title(
+                name=item["name"],
+                year=item["year"],
+                description=item.get("description"),
+                category_id=item["category_id"],
+                genre_ids=item.get("genre_ids", ()),
+            )
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            if connection.features.can_return_ids_from_bulk_insert:
+                Title.objects.bulk_create(
+                    titles, batch_size=settings.BULK_BATCH_SIZE
+                )
+                update_search_index(titles)
+            else:
+                for title in titles:
+                    title.save()
+            self._link_genres(titles, validated_data)
+            bump_version(CATALOGUE)
+        for title, item in zip(titles, validated_data):
+            title.genre_slugs = item["genre_slugs"]
+            title.category_slug = item["category_slug"]
+        return titles
+
+    def update(self, instance, validated_data):
+        fields = {
+            field
+            for item in validated_data
+            for field in ("name", "year", "description", "category_id")
+            if field in item
+        }
+        relinked = [item for item in validated_data if "genre_ids" in item]
+        with transaction.atomic():
+            titles = instance.in_bulk([item["id"] for item in validated_data])
+            titles = [titles[item["id"]] for item in validated_data]
+            for title, item in zip(titles, validated_data):
+                for field in fields & item.keys():
+                    setattr(title, field, item[field])
+            if fields:
+                Title.objects.bulk_update(
+                    titles, fields, batch_size=settings.BULK_BATCH_SIZE
+                )
+                update_search_index(titles)
+                TitleRank.objects.sync(
+                    Title.objects.filter(pk__in=[title.pk for title in titles])
+                )
+            if relinked:
+                Title.genre.through.objects.filter(
+                    title_id__in=[item["id"] for item in relinked]
+                ).delete()
+                self._link_genres(
+                    [Title(pk=item["id"]) for item in relinked], relinked
+                )
+                Title.objects.filter(
+                    pk__in=[item["id"] for item in relinked]
+                ).refresh_genre_ids()
+            bump_version(CATALOGUE)
+        genre_slugs = {}
+        for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=[title.pk for title in titles]
+        ).values_list("title_id", "genre_id"):
+            genre = genres.get(genre_id)
+            if genre is not None:
+                genre_slugs.setdefault(title_id, []).append(genre.slug)
+        for title in titles:
+            category = (
+                None if title.category_id is None
+                else categories.get(title.category_id)
+            )
+            title.genre_slugs = genre_slugs.get(title.pk, [])
+            title.category_slug = category and category.slug
+        return titles
+
+
+class TitleBulkItemSerializer(serializers.Serializer):
+    """One title of a bulk request, slugs are resolved by the list."""
+
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=256)
+    year = serializers.IntegerField(min_value=0, validators=(validate_year,))
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    genre = serializers.ListField(
+        child=serializers.SlugField(), source="genre_slugs"
+    )
+    category = serializers.SlugField(source="category_slug")
+
+    class Meta:
+        list_serializer_class = TitleBulkSerializer
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Serializer for requests to endpoints of 'Reviews' resource."""
 
@@ -85,18 +437,24 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ("id", "text", "author", "score", "pub_date")
 
-    def validate(self, data):
-        request = self.context["request"]
-        if request.method != "POST":
-            return data
-        title_id = self.context["request"].parser_context["kwargs"]["title_id"]
-        if Review.objects.filter(
-            title_id=title_id, author=request.user
-        ).exists():
+    def create(self, validated_data):
+        """Create the review, the constraints check the title and author.
+
+        No queries are made ahead of the insert or after it fails: the
+        'unique_review' constraint rejects a second review of the author.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError as error:
+            if not Review.is_duplicate(error):
+                raise
             raise ValidationError(
-                """You can only leave one review for this creation."""
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "You can only leave one review for this creation."
+                    ]
+                }
             )
-        return data
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -1,10 +1,13 @@
 """URLs request handlers of the 'api' application."""
 
 from api.mixins import (
+    ConditionalGetMixin,
     CreateListDeleteViewSet,
     ModelViewSetWithoutPUT,
+    VersionedResponseCacheMixin,
 )
-from api.v1.filters import TitleFilter
+from api.v1.filters import TitleFilter, TopTitleFilter
+from api.v1.pagination import PageNumberOrCursorPagination
 from api.v1.permissions import (
     IsAdmin,
     IsAdminModeratorAuthorOrReadOnly,
@@ -17,15 +20,20 @@ from api.v1.serializers import (
     GetTokenSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitleBulkItemSerializer,
     TitleSerializerRead,
     TitleSerializerWrite,
+    TitleStatsSerializer,
     UserSerializer,
+    represent_title_rows,
+    represent_top_title_rows,
+    title_rows,
+    top_title_rows,
 )
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import utils
-from django.db.models import Avg
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, serializers, status
@@ -33,11 +41,27 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from reviews import references
+from reviews.models import (
+    Category,
+    Genre,
+    Review,
+    Title,
+    TitleRank,
+    TitleStats,
+)
+from reviews.versions import (
+    CATALOGUE,
+    CATEGORIES,
+    GENRES,
+    USERS,
+    comments_of,
+    reviews_of,
+)
+from users.models import EmailOutbox, User
 
 
-class CategoryViewSet(CreateListDeleteViewSet):
+class CategoryViewSet(ConditionalGetMixin, CreateListDeleteViewSet):
     """URL requests handler to 'Categories' resource endpoints."""
 
     queryset = Category.objects.all()
@@ -47,8 +71,11 @@ class CategoryViewSet(CreateListDeleteViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
 
+    def get_condition_names(self):
+        return (CATEGORIES,)
 
-class GenreViewSet(CreateListDeleteViewSet):
+
+class GenreViewSet(ConditionalGetMixin, CreateListDeleteViewSet):
     """URL requests handler to 'Genres' resource endpoints."""
 
     queryset = Genre.objects.all()
@@ -58,61 +85,175 @@ class GenreViewSet(CreateListDeleteViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
 
+    def get_condition_names(self):
+        return (GENRES,)
+
 
-class TitleViewSet(ModelViewSetWithoutPUT):
+class TitleViewSet(
+    ConditionalGetMixin, VersionedResponseCacheMixin, ModelViewSetWithoutPUT
+):
     """URL requests handler to 'Titles' resource endpoints."""
 
-    queryset = Title.objects.select_related(
-        "category"
-    ).prefetch_related(
-        "genre"
-    ).annotate(
-        rating=Avg("reviews__score")
-    ).order_by("name")
+    # Categories and genres are shown from the per process copies.
+    queryset = Title.objects.order_by("name")
+    lookup_value_regex = r"\d+"
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
-    filterset_class = TitleFilter
+    cache_version_name = CATALOGUE
+    conditional_actions = ("list", "retrieve", "stats", "top")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        references.refresh(self.prefetched)
+
+    def get_prefetched_keys(self, request):
+        keys = list(references.STATE_KEYS)
+        if self.action in {"list", "retrieve", "top"}:
+            keys.extend(self.get_response_cache_keys(request))
+        return keys
+
+    def get_condition_names(self):
+        if self.action == "stats":
+            return (reviews_of(self.kwargs["pk"]),)
+        return (CATALOGUE,)
+
+    @property
+    def filterset_class(self):
+        if self.action == "top":
+            return TopTitleFilter
+        return TitleFilter
+
+    def get_queryset(self):
+        if self.action == "top":
+            return TitleRank.objects.all()
+        return super().get_queryset()
 
     def get_serializer_class(self):
-        if self.action in {"list", "retrieve"}:
+        if self.action in {"list", "retrieve", "top"}:
             return TitleSerializerRead
+        if self.action == "bulk":
+            return TitleBulkItemSerializer
+        if self.action == "stats":
+            return TitleStatsSerializer
         return TitleSerializerWrite
 
+    def list(self, request, *args, **kwargs):
+        if not settings.TITLE_LIST_FAST_PATH:
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(self.list_rows, request, *args, **kwargs)
+
+    def list_rows(self, request, *args, **kwargs):
+        """The 'list' action built from plain rows, not serializers."""
+        rows = title_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(represent_title_rows(rows))
+        return self.get_paginated_response(represent_title_rows(page))
+
+    @action(detail=False, url_path="bulk", methods=("post", "patch"))
+    def bulk(self, request):
+        """Create (POST) or update (PATCH) a list of titles at once."""
+        if request.method == "POST":
+            serializer = self.get_serializer(data=request.data, many=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        serializer = self.get_serializer(
+            Title.objects.all(), data=request.data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, url_path="top", methods=("get",))
+    def top(self, request):
+        """Rated titles by their Bayesian average score, best first.
+
+        Served from the ranks of 'TitleRank', a page is one range of its
+        score indexes.
+        """
+        return self.cached_response(self.top_rows, request)
+
+    def top_rows(self, request):
+        rows = top_title_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(represent_top_title_rows(rows))
+        return self.get_paginated_response(represent_top_title_rows(page))
+
+    @action(detail=True, url_path="stats", methods=("get",))
+    def stats(self, request, pk=None):
+        """Score histogram, count, mean and median of the title reviews."""
+        stats = TitleStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            title = get_object_or_404(Title.objects.order_by(), pk=pk)
+            stats = TitleStats.objects.for_title(title.pk)
+        return Response(self.get_serializer(stats).data)
+
 
-class ReviewViewSet(ModelViewSetWithoutPUT):
+class ReviewViewSet(ConditionalGetMixin, ModelViewSetWithoutPUT):
     """URL requests handler to 'Reviews' resource endpoints."""
 
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = PageNumberOrCursorPagination
+
+    def get_condition_names(self):
+        return (reviews_of(self.kwargs["title_id"]), USERS)
 
     def get_title_obj(self):
         return get_object_or_404(Title, id=self.kwargs["title_id"])
 
     def get_queryset(self):
         title = self.get_title_obj()
-        return title.reviews.select_related("author")
+        return title.reviews.filter(
+            author__deleted_at__isnull=True
+        ).select_related("author")
 
     def perform_create(self, serializer):
-        title = self.get_title_obj()
-        serializer.save(author=self.request.user, title=title)
+        """Insert the review without reading the title first.
 
+        The rating update of the insert transaction finds out whether the
+        title exists.
+        """
+        try:
+            serializer.save(
+                author=self.request.user,
+                title_id=int(self.kwargs["title_id"]),
+            )
+        except Title.DoesNotExist:
+            raise Http404
 
-class CommentViewSet(ModelViewSetWithoutPUT):
+
+class CommentViewSet(ConditionalGetMixin, ModelViewSetWithoutPUT):
     """URL requests handler to 'Comments' resource endpoints."""
 
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = PageNumberOrCursorPagination
+
+    def get_condition_names(self):
+        # Comments of a deleted review or title are deleted without
+        # signals, the counter of the reviews moves instead.
+        return (
+            comments_of(self.kwargs["review_id"]),
+            reviews_of(self.kwargs["title_id"]),
+            USERS,
+        )
 
     def get_review_obj(self):
         return get_object_or_404(
             Review,
             id=self.kwargs["review_id"],
             title_id=self.kwargs["title_id"],
+            author__deleted_at__isnull=True,
         )
 
     def get_queryset(self):
         review = self.get_review_obj()
-        return review.comments.select_related("author")
+        return review.comments.filter(
+            author__deleted_at__isnull=True
+        ).select_related("author")
 
     def perform_create(self, serializer):
         review = self.get_review_obj()
@@ -122,13 +263,21 @@ class CommentViewSet(ModelViewSetWithoutPUT):
 class UserViewset(ModelViewSetWithoutPUT):
     """URL requests handler to 'Users' resource endpoints."""
 
-    queryset = User.objects.all()
+    # Deleted users wait for 'purge_deleted_users' hidden.
+    queryset = User.objects.filter(deleted_at__isnull=True)
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ("username",)
     lookup_field = "username"
 
+    def perform_destroy(self, instance):
+        """Deactivate the user, the purge worker deletes the rows later.
+
+        Deleting a prolific user at once would lock the reviews table.
+        """
+        instance.soft_delete()
+
     @action(
         detail=False,
         url_path="me",
@@ -158,17 +307,18 @@ def signup(request):
     try:
         user, created = User.objects.get_or_create(**serializer.validated_data)
     except utils.IntegrityError:
+        user = None
+    if user is None or not user.is_active:
         return Response(
             {"detail": "username or email is not unique or incorrect"},
             status=status.HTTP_400_BAD_REQUEST,
         )
     conf_code = default_token_generator.make_token(user)
-    send_mail(
+    EmailOutbox.objects.create(
         subject="YaMDb confirmation code",
         message=f"Use this code to get an access token: {conf_code}",
         from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=(serializer.data["email"],),
-        fail_silently=False,
+        recipient=serializer.data["email"],
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -180,7 +330,7 @@ def get_token(request):
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     user = get_object_or_404(
-        User, username=serializer.validated_data["username"]
+        User, username=serializer.validated_data["username"], is_active=True
     )
     if not default_token_generator.check_token(
         user, serializer.validated_data["confirmation_code"]
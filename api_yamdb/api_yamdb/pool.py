@@ -0,0 +1,248 @@
+"""Bounded per process pool of database connections."""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("api_yamdb.pool")
+
+# Pools of the process by database alias.
+pools = {}
+# Connections inherited from the parent process: the child never uses or
+# closes them, closing would end the sessions of the parent.
+inherited = []
+
+
+class PoolTimeoutError(Exception):
+    """No connection was released within the checkout timeout."""
+
+
+class PooledConnection:
+    """A connection of the pool with its age and idle time."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = time.monotonic()
+        self.released = self.created
+
+
+class ConnectionPool:
+    """At most 'size' connections shared by the threads of a process.
+
+    'connect', 'close' and 'check' open, close and check a connection of
+    the database. Connections are checked on checkout and closed once
+    older than
+    'max_lifetime' or idle longer than 'max_idle' seconds. A checkout
+    waits up to 'timeout' seconds for a connection when all are in use.
+    """
+
+    def __init__(
+        self,
+        connect,
+        close,
+        check,
+        size=10,
+        timeout=10,
+        max_lifetime=3600,
+        max_idle=600,
+        check_after=5,
+    ):
+        self.connect = connect
+        self.close_connection = close
+        self.check = check
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.idle = []
+        self.in_use = {}
+        self.pending = 0
+        self.condition = threading.Condition()
+        self.waiting = 0
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+        self.opened = 0
+        self.closed = {"lifetime": 0, "idle": 0, "broken": 0, "shutdown": 0}
+
+    @property
+    def open_count(self):
+        return len(self.idle) + len(self.in_use) + self.pending
+
+    def expired(self, pooled, now):
+        if now - pooled.created >= self.max_lifetime:
+            return "lifetime"
+        if now - pooled.released >= self.max_idle:
+            return "idle"
+        return None
+
+    def discard(self, pooled, reason):
+        with self.condition:
+            self.closed[reason] += 1
+        try:
+            self.close_connection(pooled.connection)
+        except Exception:
+            logger.debug("Closing a pooled connection failed.", exc_info=True)
+
+    def acquire(self):
+        """A healthy connection, opened if the pool is not full."""
+        started = time.monotonic()
+        while True:
+            pooled = self.reserve(started)
+            opened = pooled is None
+            try:
+                if opened:
+                    pooled = PooledConnection(self.connect())
+                elif not self.is_healthy(pooled):
+                    self.discard(pooled, "broken")
+                    pooled = None
+            finally:
+                waited = time.monotonic() - started
+                with self.condition:
+                    self.pending -= 1
+                    if pooled is None:
+                        self.condition.notify()
+                    else:
+                        self.in_use[id(pooled.connection)] = pooled
+                        self.opened += opened
+                        self.checkouts += 1
+                        self.wait_time += waited
+                        self.max_wait_time = max(self.max_wait_time, waited)
+            if pooled is not None:
+                return pooled.connection
+
+    def reserve(self, started):
+        """An idle connection, or 'None' and a slot for a new one."""
+        evicted = []
+        try:
+            with self.condition:
+                self.waiting += 1
+                try:
+                    return self.wait_for_slot(started, evicted)
+                finally:
+                    self.waiting -= 1
+        finally:
+            for pooled, reason in evicted:
+                self.discard(pooled, reason)
+
+    def wait_for_slot(self, started, evicted):
+        """Reserve a connection or a slot, the caller holds the lock."""
+        while True:
+            now = time.monotonic()
+            for pooled in list(self.idle):
+                reason = self.expired(pooled, now)
+                if reason:
+                    self.idle.remove(pooled)
+                    evicted.append((pooled, reason))
+            if self.idle or self.open_count < self.size:
+                self.pending += 1
+                # The most recently used connection is the least likely
+                # to be dropped by the server or a proxy.
+                return self.idle.pop() if self.idle else None
+            remaining = started + self.timeout - now
+            if remaining <= 0 or not self.condition.wait(remaining):
+                self.timeouts += 1
+                raise PoolTimeoutError(
+                    f"No database connection was released in "
+                    f"{self.timeout} s, all {self.size} are in use."
+                )
+
+    def is_healthy(self, pooled):
+        """Check the connection, pinging it if idle for 'check_after'."""
+        ping = time.monotonic() - pooled.released >= self.check_after
+        try:
+            return self.check(pooled.connection, ping)
+        except Exception:
+            logger.info("Pooled connection failed its check.", exc_info=True)
+            return False
+
+    def release(self, connection, reusable=True):
+        """Return a connection to the pool, closing it if not reusable.
+
+        Connections the pool did not hand out, such as the ones inherited
+        from the parent process, are left alone.
+        """
+        with self.condition:
+            pooled = self.in_use.pop(id(connection), None)
+            if pooled is None:
+                return
+            pooled.released = time.monotonic()
+            reason = "broken" if not reusable else self.expired(
+                pooled, pooled.released
+            )
+            if reason is None:
+                self.idle.append(pooled)
+            self.condition.notify()
+        if reason:
+            self.discard(pooled, reason)
+
+    def close_all(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for pooled in idle:
+            self.discard(pooled, "shutdown")
+
+    def stats(self):
+        """Pool level metrics of the process."""
+        with self.condition:
+            return {
+                "size": self.size,
+                "open": self.open_count,
+                "in_use": len(self.in_use),
+                "idle": len(self.idle),
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_time, 6),
+                "wait_seconds_max": round(self.max_wait_time, 6),
+                "timeouts": self.timeouts,
+                "opened": self.opened,
+                "closed": dict(self.closed),
+            }
+
+
+def get_pool(key, factory):
+    """The pool of the '(alias, database)' key in this process."""
+    if key not in pools:
+        pools.setdefault(key, factory())
+    return pools[key]
+
+
+def close_pools(database=None):
+    """Close the idle connections of the pools, to a database or all."""
+    for (_, name), pool in list(pools.items()):
+        if database is None or name == database:
+            pool.close_all()
+
+
+def forget_inherited_pools():
+    """Start the pools of a forked worker empty."""
+    for pool in pools.values():
+        inherited.extend(pooled.connection for pooled in pool.idle)
+        inherited.extend(
+            pooled.connection for pooled in pool.in_use.values()
+        )
+    pools.clear()
+
+
+def metrics():
+    """Metrics of the pools of the process in Prometheus text format."""
+    pid = os.getpid()
+    lines = []
+    for (alias, database), pool in sorted(pools.items()):
+        stats = pool.stats()
+        labels = f'alias="{alias}",database="{database}",pid="{pid}"'
+        closed = stats.pop("closed")
+        for name, value in stats.items():
+            lines.append(f"db_pool_{name}{{{labels}}} {value}")
+        for reason, value in closed.items():
+            lines.append(
+                f'db_pool_closed{{{labels},reason="{reason}"}} {value}'
+            )
+    return "\n".join(lines) + "\n"
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_inherited_pools)
@@ -0,0 +1,116 @@
+"""PostgreSQL database wrapper over the connection pool."""
+
+from django.db.backends.postgresql.base import (
+    Database,
+    DatabaseWrapper as PostgreSQLDatabaseWrapper,
+)
+from django.db.backends.postgresql.creation import (
+    DatabaseCreation as PostgreSQLDatabaseCreation,
+)
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from api_yamdb.pool import (
+    ConnectionPool,
+    PoolTimeoutError,
+    close_pools,
+    get_pool,
+)
+
+# 'POOL' keys of the database settings and the pool arguments they set.
+POOL_OPTIONS = {
+    "SIZE": "size",
+    "TIMEOUT": "timeout",
+    "MAX_LIFETIME": "max_lifetime",
+    "MAX_IDLE": "max_idle",
+    "CHECK_AFTER": "check_after",
+}
+
+
+def close_connection(connection):
+    connection.close()
+
+
+def check_connection(connection, ping):
+    """Whether the connection is open, idle and, if pinged, answers."""
+    if connection.closed or (
+        connection.get_transaction_status() != TRANSACTION_STATUS_IDLE
+    ):
+        return False
+    if ping:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        if not connection.autocommit:
+            connection.rollback()
+    return True
+
+
+def reset_connection(connection):
+    """Roll back what the connection left open, whether it is reusable."""
+    if connection.closed:
+        return False
+    try:
+        if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+    except Database.Error:
+        return False
+    return connection.get_transaction_status() == TRANSACTION_STATUS_IDLE
+
+
+class DatabaseCreation(PostgreSQLDatabaseCreation):
+    """Close the pooled connections of a test database before dropping it."""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+    """Connections are checked out from the pool and released to it.
+
+    The pool is configured by the 'POOL' dictionary of the database
+    settings: 'SIZE', 'TIMEOUT', 'MAX_LIFETIME', 'MAX_IDLE' and
+    'CHECK_AFTER' (seconds a connection may idle before it is pinged on
+    checkout).
+    """
+
+    creation_class = DatabaseCreation
+    pool = None
+
+    def get_pool(self, conn_params):
+        def connect():
+            return Database.connect(**conn_params)
+
+        options = {
+            argument: self.settings_dict["POOL"][key]
+            for key, argument in POOL_OPTIONS.items()
+            if key in self.settings_dict.get("POOL", {})
+        }
+        return get_pool(
+            (self.alias, conn_params["database"]),
+            lambda: ConnectionPool(
+                connect, close_connection, check_connection, **options
+            ),
+        )
+
+    def get_new_connection(self, conn_params):
+        try:
+            self.pool = self.get_pool(conn_params)
+            connection = self.pool.acquire()
+        except PoolTimeoutError as error:
+            raise Database.OperationalError(str(error)) from error
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # A connection closed inside 'atomic' is in an unknown state.
+        reusable = not self.in_atomic_block and reset_connection(
+            self.connection
+        )
+        with self.wrap_database_errors:
+            self.pool.release(self.connection, reusable)
@@ -0,0 +1,135 @@
+"""Database routing of reads to the replicas."""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger("api_yamdb.routers")
+
+# Routing of the current request, 'None' outside requests.
+routing = ContextVar("routing", default=None)
+
+POSTGRESQL_LAG = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery()"
+    " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+class RequestRouting:
+    """Where the reads of one request go.
+
+    A request may read from a replica unless its client is pinned to
+    the primary. After the first write of the request every read goes
+    to the primary too, so the request sees its own changes.
+    """
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.replica = None
+        self.primary_reads = 0
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the block to the primary.
+
+    For reads whose results are shared through the cache or written
+    back, a lagging replica would keep them stale for everyone.
+    """
+    state = routing.get()
+    if state is None:
+        yield
+        return
+    state.primary_reads += 1
+    try:
+        yield
+    finally:
+        state.primary_reads -= 1
+
+
+class ReplicaHealth:
+    """Per process health and lag of the replicas, checked periodically."""
+
+    def __init__(self):
+        self.checked = {}
+        self.healthy = {}
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.checked.clear()
+            self.healthy.clear()
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        if now - self.checked.get(alias, -float("inf")) >= (
+            settings.DB_REPLICA_CHECK_INTERVAL
+        ):
+            with self.lock:
+                self.checked[alias] = now
+            healthy = self.check(alias)
+            with self.lock:
+                self.healthy[alias] = healthy
+        return self.healthy.get(alias, False)
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                if connections[alias].vendor == "postgresql":
+                    cursor.execute(POSTGRESQL_LAG)
+                else:
+                    cursor.execute("SELECT 0")
+                lag = float(cursor.fetchone()[0] or 0)
+        except Exception:
+            logger.warning(
+                "Replica '%s' is unavailable.", alias, exc_info=True
+            )
+            return False
+        if lag > settings.DB_REPLICA_MAX_LAG:
+            logger.warning("Replica '%s' lags %.1f s behind.", alias, lag)
+            return False
+        return True
+
+
+health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """Send reads of safe requests to a healthy replica.
+
+    Writes, reads outside requests, reads of pinned clients and reads
+    after a write of the request go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing.get()
+        if state is None or not state.use_replica or state.primary_reads:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            replicas = [
+                alias
+                for alias in settings.DB_REPLICAS
+                if health.is_healthy(alias)
+            ]
+            state.replica = random.choice(replicas) if replicas else ""
+        return state.replica or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = routing.get()
+        if state is not None:
+            state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DB_REPLICAS
@@ -1,4 +1,5 @@
 import os
+from importlib.util import find_spec
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -17,16 +18,19 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "django_filters",
     "users.apps.UsersConfig",
-    "reviews",
+    "reviews.apps.ReviewsConfig",
     "api",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.CompressionMiddleware",
+    "api.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -64,7 +68,53 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='97qwerty'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Used by the 'api_yamdb.pooled_postgresql' engine
+        "POOL": {
+            "SIZE": int(os.getenv("DB_POOL_SIZE", default=10)),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", default=10)),
+            "MAX_LIFETIME": float(
+                os.getenv("DB_POOL_MAX_LIFETIME", default=3600)
+            ),
+            "MAX_IDLE": float(os.getenv("DB_POOL_MAX_IDLE", default=600)),
+            "CHECK_AFTER": float(
+                os.getenv("DB_POOL_CHECK_AFTER", default=5)
+            ),
+        },
+    }
+}
+
+# Read replicas: comma separated hosts, database files on SQLite
+DB_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv("DB_REPLICAS", default="").split(",")), 1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = dict(DATABASES["default"], TEST={"MIRROR": "default"})
+    if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+        DATABASES[alias]["NAME"] = replica
+    else:
+        DATABASES[alias]["HOST"] = replica
+    DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["api_yamdb.routers.ReplicaRouter"]
+
+# Seconds a client reads from the primary after its write
+DB_PIN_SECONDS = int(os.getenv("DB_PIN_SECONDS", default=15))
+# Replicas lagging behind more seconds are skipped
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", default=5))
+# Seconds between health checks of a replica in one process
+DB_REPLICA_CHECK_INTERVAL = float(
+    os.getenv("DB_REPLICA_CHECK_INTERVAL", default=10)
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default=""),
     }
 }
 
@@ -92,6 +142,7 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATICFILES_DIRS_DATA = os.path.join(STATIC_ROOT, 'data')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -99,12 +150,32 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Redefining the 'User' model
 AUTH_USER_MODEL = "users.User"
 
+# orjson renders and parses JSON; MessagePack is negotiated by the
+# 'Accept' and 'Content-Type' headers when 'msgpack' is installed
+RENDERER_CLASSES = ["api.renderers.ORJSONRenderer"]
+PARSER_CLASSES = [
+    "api.parsers.ORJSONParser",
+    "rest_framework.parsers.FormParser",
+    "rest_framework.parsers.MultiPartParser",
+]
+if find_spec("msgpack"):
+    RENDERER_CLASSES.append("api.renderers.MessagePackRenderer")
+    PARSER_CLASSES.append("api.parsers.MessagePackParser")
+RENDERER_CLASSES.append("rest_framework.renderers.BrowsableAPIRenderer")
+
+# Responses of at least this many bytes are gzipped for clients accepting it
+RESPONSE_COMPRESSION_MIN_SIZE = int(
+    os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", default=1024)
+)
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": RENDERER_CLASSES,
+    "DEFAULT_PARSER_CLASSES": PARSER_CLASSES,
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 4,
@@ -119,7 +190,7 @@ if DEBUG:
     REST_FRAMEWORK.update(
         {
             "DEFAULT_AUTHENTICATION_CLASSES": [
-                "rest_framework_simplejwt.authentication.JWTAuthentication",
+                "api.authentication.CachedJWTAuthentication",
                 "rest_framework.authentication.SessionAuthentication",
             ],
         }
@@ -134,3 +205,41 @@ UNACCEPTABLE_USERNAME = "me"
 USERNAME_PATTERN = r"[\w.@+-]+"
 
 NUM_CHAR = 15
+
+# Limits of the bulk endpoints
+BULK_MAX_ITEMS = 1000
+BULK_BATCH_SIZE = 500
+
+# Lifetime of cached users of authenticated requests, seconds
+USER_SNAPSHOT_TIMEOUT = int(os.getenv("USER_SNAPSHOT_TIMEOUT", default=60))
+
+# Lifetime of cached catalogue responses, seconds
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", default=300))
+
+# Titles list built from plain rows instead of 'TitleSerializerRead'
+TITLE_LIST_FAST_PATH = os.getenv("TITLE_LIST_FAST_PATH", default="1") == "1"
+
+# Reviews and comments of deleted users purged per second at most
+USER_PURGE_RATE = float(os.getenv("USER_PURGE_RATE", default=200))
+
+# Virtual average reviews added to every title on the top titles leaderboard
+RANKING_PRIOR_WEIGHT = int(os.getenv("RANKING_PRIOR_WEIGHT", default=10))
+
+# Opt-in SQL instrumentation of requests, see 'api.middleware'
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", default="") == "1"
+SQL_REPEATED_QUERY_THRESHOLD = int(
+    os.getenv("SQL_REPEATED_QUERY_THRESHOLD", default=5)
+)
+if SQL_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "api.middleware.QueryInstrumentationMiddleware")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.sql": {"handlers": ["console"], "level": "INFO"},
+    },
+}
@@ -5,6 +5,7 @@ from django.urls import include, path
 from django.views.generic import TemplateView
 
 from api_yamdb import settings
+from api_yamdb.views import pool_metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -14,6 +15,7 @@ urlpatterns = [
         TemplateView.as_view(template_name="redoc.html"),
         name="redoc",
     ),
+    path("metrics/db-pool/", pool_metrics, name="db-pool-metrics"),
 ]
 if settings.DEBUG:
     urlpatterns += (
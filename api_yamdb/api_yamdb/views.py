@@ -0,0 +1,13 @@
+"""Service views of the 'api_yamdb' project."""
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from api_yamdb.pool import metrics
+
+
+def pool_metrics(request):
+    """Connection pool metrics of the worker, for internal addresses only."""
+    if request.META.get("REMOTE_ADDR") not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(metrics(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,104 @@
+"""Warm up the process before it serves requests.
+
+Run once in the gunicorn master with 'preload_app', the workers forked
+afterwards share the compiled URL patterns, built serializer fields and
+primed caches copy-on-write.
+"""
+
+import inspect
+import logging
+import time
+
+from django.core.cache import caches
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver, resolve, reverse
+from rest_framework import serializers
+
+from api.v1 import serializers as v1_serializers
+from api.v1.urls import auth_urlpatterns, router_v1
+from api_yamdb.pool import close_pools
+from reviews import references
+
+logger = logging.getLogger("api_yamdb.warmup")
+
+# First pages of the title lists, kept in the versioned response cache.
+CACHED_URLS = ("/api/v1/titles/", "/api/v1/titles/top/")
+
+
+def route_kwargs(pattern):
+    return {
+        name: "json" if name == "format" else "1"
+        for name in pattern.pattern.regex.groupindex
+    }
+
+
+def resolve_routes():
+    """Compile the URL patterns and resolve every route of the API v1."""
+    get_resolver()
+    routes = 0
+    for pattern in [*router_v1.urls, *auth_urlpatterns]:
+        if pattern.name is None:
+            continue
+        resolve(reverse(f"api:{pattern.name}", kwargs=route_kwargs(pattern)))
+        routes += 1
+    return routes
+
+
+def build_serializers():
+    """Build the fields of every serializer of the API v1."""
+    fields = 0
+    for _, serializer_class in inspect.getmembers(
+        v1_serializers, inspect.isclass
+    ):
+        if (
+            issubclass(serializer_class, serializers.Serializer)
+            and serializer_class.__module__ == v1_serializers.__name__
+        ):
+            fields += len(serializer_class().fields)
+    return fields
+
+
+def prime_caches():
+    """Load the reference data and cache the first title list pages."""
+    references.load()
+    client = Client()
+    for url in CACHED_URLS:
+        response = client.get(url)
+        if response.status_code != 200:
+            logger.warning(
+                "Warmup of '%s' answered %s.", url, response.status_code
+            )
+    return len(CACHED_URLS)
+
+
+STEPS = (
+    ("routes", resolve_routes),
+    ("serializers", build_serializers),
+    ("caches", prime_caches),
+)
+
+
+def warm_up():
+    """Run the warmup steps, the '(step, items, seconds)' they took.
+
+    A failed step is logged and skipped, warmup never stops the start.
+    """
+    report = []
+    for name, step in STEPS:
+        started = time.monotonic()
+        try:
+            items = step()
+        except Exception:
+            logger.exception("Warmup step '%s' failed.", name)
+            items = 0
+        report.append((name, items, time.monotonic() - started))
+    return report
+
+
+def release_connections():
+    """Close the connections that forked workers must not share."""
+    connections.close_all()
+    close_pools()
+    for cache in caches.all():
+        cache.close()
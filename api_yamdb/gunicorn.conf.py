@@ -0,0 +1,66 @@
+"""Gunicorn configuration of the 'api_yamdb' project.
+
+The application is loaded and warmed up once in the master, the workers
+forked from it share its memory copy-on-write.
+"""
+
+import multiprocessing
+import os
+import time
+
+STARTED = time.monotonic()
+
+bind = os.getenv("GUNICORN_BIND", default="0:8000")
+workers = int(
+    os.getenv("GUNICORN_WORKERS", default=multiprocessing.cpu_count() * 2 + 1)
+)
+preload_app = True
+# Warm up before the workers are forked, 'GUNICORN_WARMUP=0' skips it
+warmup = os.getenv("GUNICORN_WARMUP", default="1") == "1"
+
+
+def on_starting(server):
+    """Refuse to fork several workers over a per process cache.
+
+    Version counters, user snapshots and replica pins live in the cache,
+    a change made in one worker must reach all of them.
+    """
+    from django.conf import settings
+
+    backend = settings.CACHES["default"]["BACKEND"]
+    if server.cfg.workers > 1 and backend.endswith(".LocMemCache"):
+        raise RuntimeError(
+            f"{server.cfg.workers} workers cannot share the local memory "
+            "cache, set CACHE_BACKEND to a shared cache or "
+            "GUNICORN_WORKERS=1."
+        )
+
+
+def when_ready(server):
+    """Warm up the preloaded application and report the start time."""
+    from api_yamdb.warmup import release_connections, warm_up
+
+    loaded = time.monotonic()
+    report = warm_up() if warmup else []
+    release_connections()
+    ready = time.monotonic()
+    server.log.info(
+        "Ready in %.2f s: application loaded in %.2f s, warmed up in %.2f s",
+        ready - STARTED,
+        loaded - STARTED,
+        ready - loaded,
+    )
+    for step, items, seconds in report:
+        server.log.info("Warmup %s: %s in %.3f s", step, items, seconds)
+
+
+def pre_fork(server, worker):
+    worker.forked = time.monotonic()
+
+
+def post_worker_init(worker):
+    worker.log.info(
+        "Worker %s ready in %.3f s after fork",
+        worker.pid,
+        time.monotonic() - worker.forked,
+    )
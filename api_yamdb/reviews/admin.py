@@ -1,9 +1,35 @@
 """Admin site settings of the 'Reviews' application."""
 
 from django.contrib import admin
+from django.contrib.auth import get_permission_codename
 from reviews.models import Category, Comment, Genre, Review, Title
 
 
+class CountCascadesMixin:
+    """Counts the rows deleted in cascade on the confirmation page.
+
+    Listing them would load every review and comment of a popular
+    title. 'cascades' are '(model, lookup of the deleted objects)' pairs.
+    """
+
+    cascades = ()
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        model_count = {self.model._meta.verbose_name_plural: len(objs)}
+        perms_needed = set()
+        for model, lookup in self.cascades:
+            opts = model._meta
+            count = model.objects.filter(**{f"{lookup}__in": objs}).count()
+            model_count[opts.verbose_name_plural] = count
+            codename = get_permission_codename("delete", opts)
+            if count and not request.user.has_perm(
+                f"{opts.app_label}.{codename}"
+            ):
+                perms_needed.add(opts.verbose_name)
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     """Table settings for resource 'Category' on the admin site."""
@@ -29,9 +55,10 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(CountCascadesMixin, admin.ModelAdmin):
     """Table settings for resource 'Title' on the admin site."""
 
+    cascades = ((Review, "title"), (Comment, "review__title"))
     list_display = (
         "pk",
         "name",
@@ -46,9 +73,10 @@ class TitleAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(CountCascadesMixin, admin.ModelAdmin):
     """Table settings for resource 'Review' on the admin site."""
 
+    cascades = ((Comment, "review"),)
     list_display = (
         "pk",
         "title_id",
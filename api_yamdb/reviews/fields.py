@@ -0,0 +1,91 @@
+"""Custom model fields of the 'Reviews' application."""
+
+from django.db import models
+from django.db.models import Lookup
+
+SEPARATOR = ","
+
+
+class IdArrayField(models.Field):
+    """Sorted list of integer ids in one column.
+
+    PostgreSQL stores an 'integer[]' that a GIN index serves; other
+    databases store the ids as ',1,5,9,' text matched with 'LIKE'.
+    """
+
+    description = "List of integer ids"
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", list)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "integer[]"
+        return "text"
+
+    def get_prep_value(self, value):
+        return sorted({int(item) for item in value or ()})
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if connection.vendor == "postgresql":
+            return value
+        return SEPARATOR + "".join(f"{item}{SEPARATOR}" for item in value)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, list):
+            return value
+        return [int(item) for item in value.split(SEPARATOR) if item]
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            return self.from_db_value(value, None, None)
+        return value
+
+
+class IdArrayLookup(Lookup):
+    """Match rows by a list of ids, the ids are bound as they are."""
+
+    prepare_rhs = False
+    postgresql_operator = None
+    empty_match = None
+    joiner = None
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        ids = sorted({int(item) for item in self.rhs})
+        if not ids:
+            return self.empty_match, []
+        if connection.vendor == "postgresql":
+            return (
+                f"{lhs} {self.postgresql_operator} %s::integer[]",
+                [*lhs_params, ids],
+            )
+        condition = f"{lhs} LIKE %s"
+        params = []
+        for item in ids:
+            params += [*lhs_params, f"%{SEPARATOR}{item}{SEPARATOR}%"]
+        return f"({self.joiner.join([condition] * len(ids))})", params
+
+
+@IdArrayField.register_lookup
+class ContainsAll(IdArrayLookup):
+    """Rows holding every id of the list, an empty list matches all."""
+
+    lookup_name = "contains_all"
+    postgresql_operator = "@>"
+    empty_match = "1 = 1"
+    joiner = " AND "
+
+
+@IdArrayField.register_lookup
+class ContainsAny(IdArrayLookup):
+    """Rows holding at least one id of the list."""
+
+    lookup_name = "contains_any"
+    postgresql_operator = "&&"
+    empty_match = "1 = 0"
+    joiner = " OR "
@@ -0,0 +1,419 @@
+"""Generate a large synthetic dataset for load and index testing."""
+
+import csv
+import io
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRank,
+    TitleStats,
+)
+from reviews.search import rebuild_search_index
+from reviews.versions import (
+    CATALOGUE,
+    CATEGORIES,
+    GENRES,
+    USERS,
+    bump_version,
+)
+from users.models import User
+
+USERNAME_PREFIX = "synthetic"
+NULL = r"\N"
+ADJECTIVES = (
+    "Тихий", "Последний", "Белый", "Тёмный", "Северный", "Золотой",
+    "Забытый", "Долгий", "Красный", "Великий", "Странный", "Новый",
+    "Старый", "Ночной", "Зимний", "Далёкий", "Быстрый", "Чужой",
+)
+NOUNS = (
+    "дом", "берег", "город", "сад", "путь", "остров", "ветер", "мост",
+    "лес", "огонь", "сон", "голос", "камень", "день", "поезд", "свет",
+    "человек", "океан", "год", "рассвет",
+)
+WORDS = (
+    "сюжет", "герой", "финал", "автор", "атмосфера", "ритм", "идея",
+    "музыка", "диалог", "образ", "очень", "слишком", "немного", "яркий",
+    "скучный", "сильный", "точный", "неожиданный", "глубокий", "простой",
+)
+
+
+def zipf_counts(total, buckets, exponent, cap, rng):
+    """Spread 'total' over 'buckets' by Zipf's law, at most 'cap' each.
+
+    Ranks are shuffled, so popular buckets are scattered over the ids.
+    """
+    if total > buckets * cap:
+        raise CommandError(
+            f"{total} reviews do not fit {buckets} titles "
+            f"with {cap} authors each."
+        )
+    weights = [rank ** -exponent for rank in range(1, buckets + 1)]
+    scale = total / sum(weights)
+    counts = [min(int(weight * scale), cap) for weight in weights]
+    left = total - sum(counts)
+    while left:
+        for rank in range(buckets):
+            if counts[rank] < cap:
+                counts[rank] += 1
+                left -= 1
+                if not left:
+                    break
+    rng.shuffle(counts)
+    return counts
+
+
+def random_texts(rng, low, high, number=1000):
+    """Pool of texts to draw from, building a text per row is slow."""
+    return [
+        " ".join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+        for _ in range(number)
+    ]
+
+
+def comments_number(rate, rng):
+    """Geometrically distributed number of comments, 'rate' on average."""
+    if not rate:
+        return 0
+    number = 0
+    while rng.random() < rate / (rate + 1):
+        number += 1
+    return number
+
+
+def id_array(ids):
+    """Value of an 'IdArrayField' column as the driver takes it."""
+    return Title._meta.get_field("genre_ids").get_db_prep_value(
+        ids, connection
+    )
+
+
+def next_id(model):
+    """First primary key free of both existing and generated rows."""
+    last = model.objects.order_by("-pk").values_list("pk", flat=True).first()
+    return (last or 0) + 1
+
+
+def copy_value(value):
+    """Text of a value in the 'COPY' csv format."""
+    if value is None:
+        return NULL
+    if isinstance(value, list):
+        return "{" + ",".join(map(str, value)) + "}"
+    return value
+
+
+class TableWriter:
+    """Buffer rows of one table and write them in batches.
+
+    Values are passed to the driver as is, so datetimes must be naive
+    where the database has no time zone support. Columns absent from
+    'columns' get the model default, evaluated once.
+    PostgreSQL batches go through 'COPY', the others through
+    'executemany'. A writer flushes the tables it references first.
+    """
+
+    def __init__(self, model, columns, chunk_size, depends_on=()):
+        fields = {
+            field.attname: field for field in model._meta.concrete_fields
+        }
+        defaults = {
+            attname: field.get_default()
+            for attname, field in fields.items()
+            if attname not in columns and not field.primary_key
+        }
+        self.columns = [fields[attname].column for attname in columns]
+        self.columns += [fields[attname].column for attname in defaults]
+        self.defaults = tuple(
+            connection.ops.adapt_datetimefield_value(value)
+            if fields[attname].get_internal_type() == "DateTimeField"
+            else value
+            for attname, value in defaults.items()
+        )
+        self.table = model._meta.db_table
+        self.chunk_size = chunk_size
+        self.depends_on = depends_on
+        self.rows = []
+        self.written = 0
+
+    def add(self, *row):
+        self.rows.append((*row, *self.defaults))
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for writer in self.depends_on:
+            writer.flush()
+        if not self.rows:
+            return
+        quote = connection.ops.quote_name
+        columns = ", ".join(map(quote, self.columns))
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in self.rows:
+                    writer.writerow(map(copy_value, row))
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {quote(self.table)} ({columns})"
+                    f" FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+                    buffer,
+                )
+            else:
+                cursor.executemany(
+                    f"INSERT INTO {quote(self.table)} ({columns})"
+                    f" VALUES ({', '.join(['%s'] * len(self.columns))})",
+                    self.rows,
+                )
+        self.written += len(self.rows)
+        self.rows = []
+
+
+class Command(BaseCommand):
+    """Generate synthetic users, catalogue, reviews and comments."""
+
+    help = (
+        "Append a synthetic dataset: users, categories, genres, titles, "
+        "Zipf-distributed reviews and comments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument("--titles", type=int, default=10000)
+        parser.add_argument("--reviews", type=int, default=100000)
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Exponent of the reviews per title skew, 0 is uniform.",
+        )
+        parser.add_argument(
+            "--genres-per-title",
+            type=int,
+            default=3,
+            help="Maximum number of genres of one title.",
+        )
+        parser.add_argument(
+            "--comments-per-review",
+            type=float,
+            default=0.5,
+            help="Average number of comments of one review.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=3650,
+            help="Reviews and comments are spread over the last days.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Rows written by one 'COPY' or 'INSERT' batch.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random generator seed."
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the catalogue and the synthetic users first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["titles"] < 1 or options["users"] < 1:
+            raise CommandError("At least one title and one user are needed.")
+        rng = random.Random(options["seed"])
+        counts = zipf_counts(
+            options["reviews"],
+            options["titles"],
+            options["zipf"],
+            options["users"],
+            rng,
+        )
+        if options["clear"]:
+            clear_dataset()
+        started = time.monotonic()
+        chunk_size = options["chunk_size"]
+        users = generate_users(options["users"], chunk_size, rng)
+        categories = generate_named(
+            Category, "Категория", "category", options["categories"]
+        )
+        genres = generate_named(Genre, "Жанр", "genre", options["genres"])
+        writers = generate_titles(
+            counts, users, categories, genres, options, rng
+        )
+        with connection.cursor() as cursor:
+            models = [User, Category, Genre, Title, Review, Comment]
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        rebuild_search_index()
+        TitleRank.objects.rebuild()
+        for name in (CATALOGUE, CATEGORIES, GENRES, USERS):
+            bump_version(name)
+        total = len(users) + len(categories) + len(genres)
+        for writer in writers:
+            total += writer.written
+            self.stdout.write(
+                f"Table '{writer.table}': {writer.written} rows."
+            )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"Generated {total} rows in {elapsed:.1f} s, "
+            f"{total / max(elapsed, 1e-6):.0f} rows/s."
+        )
+
+
+def clear_dataset():
+    """Delete the catalogue tables and the synthetic users."""
+    models = [
+        TitleRank,
+        TitleStats,
+        Comment,
+        Review,
+        Title.genre.through,
+        Title,
+        Genre,
+        Category,
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in models:
+            table = connection.ops.quote_name(model._meta.db_table)
+            cursor.execute(f"DELETE FROM {table}")
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+
+def generate_users(count, chunk_size, rng):
+    """Write users with unusable passwords, return their ids."""
+    start = next_id(User)
+    writer = TableWriter(
+        User, ("id", "username", "email", "password", "role"), chunk_size
+    )
+    for user_id in range(start, start + count):
+        username = f"{USERNAME_PREFIX}{user_id}"
+        role = User.MODERATOR if rng.random() < 0.01 else User.USER
+        writer.add(
+            user_id, username, f"{username}@yamdb.fake", "!", role
+        )
+    writer.flush()
+    return range(start, start + count)
+
+
+def generate_named(model, name, slug, count):
+    """Write categories or genres, return their ids."""
+    start = next_id(model)
+    writer = TableWriter(model, ("id", "name", "slug"), count or 1)
+    for row_id in range(start, start + count):
+        writer.add(row_id, f"{name} {row_id}", f"{slug}-{row_id}")
+    writer.flush()
+    return range(start, start + count)
+
+
+def generate_titles(counts, users, categories, genres, options, rng):
+    """Write titles with their genres, reviews and comments.
+
+    Scores of a title are drawn before the title row, so its rating
+    aggregates and score histogram are written right away.
+    """
+    chunk_size = options["chunk_size"]
+    titles = TableWriter(
+        Title,
+        ("id", "name", "year", "category_id", "description",
+         "rating_sum", "rating_count", "genre_ids"),
+        chunk_size,
+    )
+    links = TableWriter(
+        Title.genre.through, ("title_id", "genre_id"), chunk_size, (titles,)
+    )
+    reviews = TableWriter(
+        Review,
+        ("id", "title_id", "author_id", "text", "score", "pub_date"),
+        chunk_size,
+        (titles,),
+    )
+    stats = TableWriter(
+        TitleStats,
+        ("title_id", *map(TitleStats.score_field, TitleStats.SCORES)),
+        chunk_size,
+        (titles,),
+    )
+    comments = TableWriter(
+        Comment,
+        ("review_id", "author_id", "text", "pub_date"),
+        chunk_size,
+        (reviews,),
+    )
+    now = timezone.now()
+    if not connection.features.supports_timezones:
+        now = timezone.make_naive(now, timezone.utc)
+    review_texts = random_texts(rng, 5, 30)
+    comment_texts = random_texts(rng, 3, 15)
+    descriptions = random_texts(rng, 10, 40)
+    span = max(options["days"], 1) * 24 * 3600
+    comments_rate = options["comments_per_review"]
+    review_id = next_id(Review)
+    title_id = next_id(Title)
+    for count in counts:
+        quality = rng.uniform(3, 9)
+        scores = [
+            min(10, max(1, round(rng.gauss(quality, 1.5))))
+            for _ in range(count)
+        ]
+        title_genres = []
+        if genres:
+            title_genres = rng.sample(
+                genres,
+                rng.randint(1, min(options["genres_per_title"], len(genres))),
+            )
+        titles.add(
+            title_id,
+            f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+            rng.randint(1900, now.year),
+            rng.choice(categories) if categories else None,
+            rng.choice(descriptions),
+            sum(scores),
+            count,
+            id_array(title_genres),
+        )
+        stats.add(
+            title_id, *(scores.count(score) for score in TitleStats.SCORES)
+        )
+        for genre_id in title_genres:
+            links.add(title_id, genre_id)
+        for author_id, score in zip(rng.sample(users, count), scores):
+            pub_date = now - timedelta(seconds=rng.randrange(span))
+            reviews.add(
+                review_id,
+                title_id,
+                author_id,
+                rng.choice(review_texts),
+                score,
+                pub_date,
+            )
+            for _ in range(comments_number(comments_rate, rng)):
+                comments.add(
+                    review_id,
+                    rng.choice(users),
+                    rng.choice(comment_texts),
+                    pub_date + (now - pub_date) * rng.random(),
+                )
+            review_id += 1
+        title_id += 1
+    writers = [titles, stats, links, reviews, comments]
+    for writer in writers:
+        writer.flush()
+    return writers
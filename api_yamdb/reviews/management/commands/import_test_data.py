@@ -2,54 +2,241 @@
 
 import csv
 import os.path
-import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
+from django.apps import apps
 from django.core import management
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
 
 from api_yamdb import settings
+from reviews.models import Title, TitleRank, TitleStats
+from reviews.search import rebuild_search_index
+from reviews.versions import CATALOGUE, bump_version
+
+CSV_DELIMITER = ";"
 
 
 class Command(BaseCommand):
     """Import test data in database."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows inserted by one batch where COPY is not available.",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=4,
+            help="Independent tables loaded in parallel (always 1 on SQLite).",
+        )
+
     def handle(self, *args, **options):
         management.call_command('migrate')
-        fill_test_data(self)
+        fill_test_data(self, options["chunk_size"], options["jobs"])
+        rebuild_search_index()
+        Title.objects.refresh_genre_ids()
+        management.call_command("reconcile_ratings")
+        TitleRank.objects.rebuild()
+        bump_version(CATALOGUE)
         self.stdout.write("All test data loaded success.")
 
 
-def fill_table_from_csv(self, db, cursor, filename):
-    """Clear table and fill data."""
-    try:
-        csv_data = open(
-            os.path.join(settings.STATICFILES_DIRS_DATA, filename),
-            "r",
-            encoding="utf8",
-        )
-    except IOError:
-        self.stdout.write(f"File '{filename}' open error.")
-    else:
-        table = filename.split(".")[0]
-        cursor.execute(f"DELETE FROM {table}")
-        dr = csv.DictReader(csv_data, delimiter=";")
-        values = []
-        for i in dr:
-            keys = ",".join(i.keys())
-            values.append(tuple(i.values()))
-        fields = ",".join("?" * len(values[0]))
-        cursor.executemany(
-            f"INSERT INTO {table} ({keys}) VALUES ({fields})", values
+def dependency_levels(models):
+    """Group models so that every model follows the models it references.
+
+    Models of one level do not reference each other and can be loaded in
+    parallel.
+    """
+    tables = {model._meta.db_table for model in models}
+    depends = {
+        model: {
+            field.related_model._meta.db_table
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model is not model
+            and field.related_model._meta.db_table in tables
+        }
+        for model in models
+    }
+    levels, loaded, remaining = [], set(), list(models)
+    while remaining:
+        level = [model for model in remaining if depends[model] <= loaded]
+        if not level:
+            raise CommandError(
+                "Circular references between tables: "
+                + ", ".join(model._meta.db_table for model in remaining)
+            )
+        levels.append(level)
+        loaded |= {model._meta.db_table for model in level}
+        remaining = [model for model in remaining if model not in level]
+    return levels
+
+
+def missing_defaults(model, columns):
+    """Model defaults of the columns absent from the file.
+
+    Django keeps defaults in Python only, so columns like
+    'Title.rating_sum' would otherwise be inserted as NULL.
+    """
+    return {
+        field.column: field.get_db_prep_save(field.get_default(), connection)
+        for field in model._meta.concrete_fields
+        if field.column not in columns and field.has_default()
+    }
+
+
+def copy_from_csv(cursor, model, csv_data):
+    """Stream the file into the table with PostgreSQL 'COPY'.
+
+    A file missing columns with defaults is copied into a temporary table
+    first and inserted from it with the defaults, the table itself is
+    never altered.
+    """
+    header = csv_data.readline()
+    columns = next(csv.reader((header,), delimiter=CSV_DELIMITER), None)
+    if not columns:
+        return 0
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    names = ", ".join(map(quote, columns))
+    defaults = missing_defaults(model, columns)
+    target = table
+    if defaults:
+        target = quote(f"import_{model._meta.db_table}")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {target} ON COMMIT DROP"
+            f" AS SELECT {names} FROM {table} WITH NO DATA"
         )
-        db.commit()
-        self.stdout.write(
-            f"Data from file '{filename}' imported in table '{table}'."
+    cursor.copy_expert(
+        f"COPY {target} ({names})"
+        f" FROM STDIN WITH (FORMAT csv, DELIMITER '{CSV_DELIMITER}')",
+        csv_data,
+    )
+    if defaults:
+        cursor.execute(
+            f"INSERT INTO {table} ({names}, {', '.join(map(quote, defaults))})"
+            f" SELECT {names}, {', '.join(['%s'] * len(defaults))}"
+            f" FROM {target}",
+            tuple(defaults.values()),
         )
+    return cursor.rowcount
+
+
+def insert_from_csv(cursor, model, csv_data, chunk_size):
+    """Insert the file into the table in batches of 'chunk_size' rows."""
+    reader = csv.reader(csv_data, delimiter=CSV_DELIMITER)
+    columns = next(reader, None)
+    if not columns:
+        return 0
+    defaults = missing_defaults(model, columns)
+    columns += list(defaults)
+    extra = tuple(defaults.values())
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)}"
+        f" ({', '.join(map(quote, columns))})"
+        f" VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    rows = 0
+    chunk = [(*row, *extra) for row in islice(reader, chunk_size)]
+    while chunk:
+        cursor.executemany(sql, chunk)
+        rows += len(chunk)
+        chunk = [(*row, *extra) for row in islice(reader, chunk_size)]
+    return rows
+
+
+def fill_table_from_csv(model, filename, chunk_size):
+    """Fill the table, return the number of rows and the elapsed time."""
+    started = time.monotonic()
+    with open(
+        os.path.join(settings.STATICFILES_DIRS_DATA, filename),
+        "r",
+        encoding="utf8",
+        newline="",
+    ) as csv_data, transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            rows = copy_from_csv(cursor, model, csv_data)
+        else:
+            rows = insert_from_csv(cursor, model, csv_data, chunk_size)
+    return rows, time.monotonic() - started
+
+
+def fill_table_in_thread(model, filename, chunk_size):
+    """Fill the table over the own database connection of the thread."""
+    try:
+        return fill_table_from_csv(model, filename, chunk_size)
+    finally:
+        connections.close_all()
+
+
+def clear_tables(levels):
+    """Empty the tables, the referencing ones first.
+
+    Tables derived from the titles and reviews go before them, they are
+    rebuilt after the import or on the first read.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in (
+            TitleStats,
+            TitleRank,
+            *(model for level in reversed(levels) for model in level),
+        ):
+            table = connection.ops.quote_name(model._meta.db_table)
+            cursor.execute(f"DELETE FROM {table}")
 
 
-def fill_test_data(self):
-    """Iterate for all tables, call funcs to prepare and fill data in db."""
-    db = sqlite3.connect(os.path.join(settings.BASE_DIR, "db.sqlite3"))
-    cursor = db.cursor()
-    for filename in os.listdir(settings.STATICFILES_DIRS_DATA):
-        fill_table_from_csv(self, db, cursor, filename)
+def fill_test_data(self, chunk_size, jobs):
+    """Clear tables and fill them from the files in dependency order."""
+    models = {
+        model._meta.db_table: model
+        for model in apps.get_models(include_auto_created=True)
+    }
+    files = {}
+    for filename in sorted(os.listdir(settings.STATICFILES_DIRS_DATA)):
+        table = os.path.splitext(filename)[0]
+        if table in models:
+            files[models[table]] = filename
+        else:
+            self.stdout.write(f"File '{filename}' matches no table, skipped.")
+    levels = dependency_levels(list(files))
+    clear_tables(levels)
+    if connection.vendor == "sqlite":
+        jobs = 1
+    total_rows, started = 0, time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for level in levels:
+            if jobs > 1:
+                results = executor.map(
+                    fill_table_in_thread,
+                    level,
+                    [files[model] for model in level],
+                    [chunk_size] * len(level),
+                )
+            else:
+                results = (
+                    fill_table_from_csv(model, files[model], chunk_size)
+                    for model in level
+                )
+            for model, (rows, elapsed) in zip(level, results):
+                total_rows += rows
+                self.stdout.write(
+                    f"Data from file '{files[model]}' imported in table "
+                    f"'{model._meta.db_table}': {rows} rows, "
+                    f"{rows / max(elapsed, 1e-6):.0f} rows/s."
+                )
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), list(files)):
+            cursor.execute(sql)
+    elapsed = time.monotonic() - started
+    self.stdout.write(
+        f"Imported {total_rows} rows in {elapsed:.1f} s, "
+        f"{total_rows / max(elapsed, 1e-6):.0f} rows/s."
+    )
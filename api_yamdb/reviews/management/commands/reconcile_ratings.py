@@ -0,0 +1,46 @@
+"""Repair stored title ratings that drifted from the reviews table."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title, TitleRank
+from reviews.versions import CATALOGUE, bump_version
+
+
+class Command(BaseCommand):
+    """Recalculate 'rating_sum' and 'rating_count' of drifted titles."""
+
+    help = "Recalculate stored title ratings that disagree with reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of titles repaired in one transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted titles, do not repair them.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Title.objects.with_rating_drift()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"Titles with drifted rating: {len(drifted)}.")
+            return
+        batch_size = options["batch_size"]
+        for start in range(0, len(drifted), batch_size):
+            with transaction.atomic():
+                Title.objects.filter(
+                    pk__in=drifted[start:start + batch_size]
+                ).reconcile_ratings()
+        if drifted:
+            TitleRank.objects.rebuild()
+            bump_version(CATALOGUE)
+        self.stdout.write(f"Titles with repaired rating: {len(drifted)}.")
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_title_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="comment",
+            options={
+                "ordering": ("pub_date", "id"),
+                "verbose_name": "comment",
+                "verbose_name_plural": "comments",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="review",
+            options={
+                "ordering": ("pub_date", "id"),
+                "verbose_name": "review",
+                "verbose_name_plural": "reviews",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["review", "pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["title", "pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+        ),
+    ]
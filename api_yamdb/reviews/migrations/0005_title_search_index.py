@@ -0,0 +1,58 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    "ALTER TABLE reviews_title ADD COLUMN search_vector tsvector"
+    " GENERATED ALWAYS AS (to_tsvector('simple',"
+    " coalesce(name, '') || ' ' || coalesce(description, ''))) STORED",
+    "CREATE INDEX reviews_title_search_vector_idx"
+    " ON reviews_title USING gin (search_vector)",
+    "CREATE INDEX reviews_title_name_trgm_idx"
+    " ON reviews_title USING gin (name gin_trgm_ops)",
+)
+POSTGRESQL_BACKWARD = (
+    "DROP INDEX IF EXISTS reviews_title_name_trgm_idx",
+    "ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector",
+)
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE reviews_title_search"
+    " USING fts5(name, description, tokenize='trigram')",
+    "INSERT INTO reviews_title_search(rowid, name, description)"
+    " SELECT id, name, coalesce(description, '') FROM reviews_title",
+)
+SQLITE_BACKWARD = ("DROP TABLE IF EXISTS reviews_title_search",)
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(
+            schema_editor.connection.vendor, ()
+        ):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0004_pub_date_keyset_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            _run(
+                {
+                    "postgresql": POSTGRESQL_FORWARD,
+                    "sqlite": SQLITE_FORWARD,
+                }
+            ),
+            _run(
+                {
+                    "postgresql": POSTGRESQL_BACKWARD,
+                    "sqlite": SQLITE_BACKWARD,
+                }
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0005_title_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TitleStats",
+            fields=[
+                (
+                    "title",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="reviews.Title",
+                        verbose_name="Title ID",
+                    ),
+                ),
+            ]
+            + [
+                (f"score_{score}", models.PositiveIntegerField(default=0))
+                for score in range(1, 11)
+            ],
+            options={
+                "verbose_name": "title statistics",
+                "verbose_name_plural": "title statistics",
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+
+import reviews.fields
+
+POSTGRESQL_FORWARD = (
+    "UPDATE reviews_title SET genre_ids = ARRAY(SELECT genre_id"
+    " FROM reviews_title_genre WHERE title_id = reviews_title.id"
+    " ORDER BY genre_id)",
+    "CREATE INDEX reviews_title_genre_ids_idx"
+    " ON reviews_title USING gin (genre_ids)",
+)
+POSTGRESQL_BACKWARD = ("DROP INDEX IF EXISTS reviews_title_genre_ids_idx",)
+SQLITE_FORWARD = (
+    "UPDATE reviews_title SET genre_ids = ',' || coalesce((SELECT"
+    " group_concat(genre_id, ',') FROM (SELECT genre_id"
+    " FROM reviews_title_genre WHERE title_id = reviews_title.id"
+    " ORDER BY genre_id)) || ',', '')",
+)
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(
+            schema_editor.connection.vendor, ()
+        ):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0006_title_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="genre_ids",
+            field=reviews.fields.IdArrayField(
+                default=list, editable=False, verbose_name="Genre IDs"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["category", "year"], name="title_category_year_idx"
+            ),
+        ),
+        migrations.RunPython(
+            _run(
+                {
+                    "postgresql": POSTGRESQL_FORWARD,
+                    "sqlite": SQLITE_FORWARD,
+                }
+            ),
+            _run({"postgresql": POSTGRESQL_BACKWARD}),
+        ),
+    ]
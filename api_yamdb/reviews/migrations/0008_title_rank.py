@@ -0,0 +1,114 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+import reviews.fields
+
+
+def rank_titles(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    TitleRank = apps.get_model("reviews", "TitleRank")
+    titles = Title.objects.filter(rating_count__gt=0)
+    totals = titles.aggregate(
+        total=Sum("rating_sum"), count=Sum("rating_count")
+    )
+    prior = totals["total"] / totals["count"] if totals["count"] else 5.5
+    weight = settings.RANKING_PRIOR_WEIGHT
+    TitleRank.objects.bulk_create(
+        (
+            TitleRank(
+                title_id=title.pk,
+                score=(weight * prior + title.rating_sum)
+                / (weight + title.rating_count),
+                rating_count=title.rating_count,
+                category_id=title.category_id,
+                year=title.year,
+                genre_ids=title.genre_ids,
+            )
+            for title in titles.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0007_title_genre_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TitleRank",
+            fields=[
+                (
+                    "title",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rank",
+                        serialize=False,
+                        to="reviews.Title",
+                        verbose_name="Title ID",
+                    ),
+                ),
+                (
+                    "score",
+                    models.FloatField(verbose_name="Bayesian average score"),
+                ),
+                (
+                    "rating_count",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of reviews"
+                    ),
+                ),
+                (
+                    "year",
+                    models.PositiveIntegerField(verbose_name="Release year"),
+                ),
+                (
+                    "genre_ids",
+                    reviews.fields.IdArrayField(
+                        default=list, editable=False, verbose_name="Genre IDs"
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="reviews.Category",
+                        verbose_name="Category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "title rank",
+                "verbose_name_plural": "title ranks",
+                "ordering": ("-score", "title"),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="titlerank",
+            index=models.Index(
+                fields=["-score", "title"], name="rank_score_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="titlerank",
+            index=models.Index(
+                fields=["category", "-score", "title"],
+                name="rank_category_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="titlerank",
+            index=models.Index(
+                fields=["year", "-score", "title"],
+                name="rank_year_score_idx",
+            ),
+        ),
+        migrations.RunPython(rank_titles, migrations.RunPython.noop),
+    ]
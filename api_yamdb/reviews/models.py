@@ -1,11 +1,53 @@
 """Database settings of the 'Reviews' application."""
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connection,
+    connections,
+    models,
+    router,
+    transaction,
+)
+from django.db.models import (
+    Count,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from reviews.fields import SEPARATOR, IdArrayField
 from reviews.validators import validate_year
+from reviews.versions import (
+    CATALOGUE,
+    bump_version,
+    comments_of,
+    reviews_of,
+)
 from users.models import User
 
+RANKING_PRIOR_KEY = "ranking:prior"
+# Middle of the 1 to 10 scale, the prior while there are no reviews
+DEFAULT_PRIOR_MEAN = 5.5
+RANKED_TITLE_FIELDS = (
+    "pk",
+    "rating_sum",
+    "rating_count",
+    "category_id",
+    "year",
+    "genre_ids",
+)
+RANKED_FIELDS = ("score", "rating_count", "category_id", "year", "genre_ids")
+# Columns of 'Title' kept up to date by queryset updates only
+DERIVED_TITLE_FIELDS = ("rating_sum", "rating_count", "genre_ids")
+
 
 class Category(models.Model):
     """'Category' resource table settings."""
@@ -55,6 +97,139 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    """Queries of the 'Title' resource."""
+
+    def change_rating(self, title_id, score_delta, count_delta):
+        """Shift the stored rating aggregates of the title by the deltas.
+
+        The rank of the title on the leaderboard follows once the
+        transaction commits. 'False' if the title does not exist.
+        """
+        if not self.filter(pk=title_id).update(
+            rating_sum=F("rating_sum") + score_delta,
+            rating_count=F("rating_count") + count_delta,
+        ):
+            return False
+        TitleRank.objects.refresh_on_commit([title_id])
+        return True
+
+    def add_score(self, title_id, score):
+        """Count the score of a new review in the title rating.
+
+        The histogram of 'TitleStats' follows in the same statement on
+        PostgreSQL. Returns whether the title exists and whether its
+        histogram row does; a missing one is built once the review is
+        saved.
+        """
+        database = connections[self._db or router.db_for_write(self.model)]
+        if database.vendor != "postgresql":
+            if not self.change_rating(title_id, score, 1):
+                return False, False
+            field = TitleStats.score_field(score)
+            return True, bool(
+                TitleStats.objects.filter(title_id=title_id).update(
+                    **{field: F(field) + 1}
+                )
+            )
+        quote = database.ops.quote_name
+        field = quote(TitleStats.score_field(score))
+        with database.cursor() as cursor:
+            cursor.execute(
+                f"WITH rated AS (UPDATE {quote(Title._meta.db_table)}"
+                " SET rating_sum = rating_sum + %s,"
+                " rating_count = rating_count + 1"
+                " WHERE id = %s RETURNING id),"
+                f" counted AS (UPDATE {quote(TitleStats._meta.db_table)}"
+                f" SET {field} = {field} + 1"
+                " WHERE title_id IN (SELECT id FROM rated) RETURNING title_id)"
+                " SELECT (SELECT count(*) FROM rated),"
+                " (SELECT count(*) FROM counted)",
+                (score, title_id),
+            )
+            rated, counted = cursor.fetchone()
+        if rated:
+            TitleRank.objects.refresh_on_commit([title_id])
+        return bool(rated), bool(counted)
+
+    def _actual_rating(self):
+        reviews = (
+            Review.objects.filter(
+                title=OuterRef("pk"), author__deleted_at__isnull=True
+            )
+            .order_by()
+            .values("title")
+        )
+        return {
+            "actual_rating_sum": Coalesce(
+                Subquery(reviews.annotate(total=Sum("score")).values("total")),
+                0,
+            ),
+            "actual_rating_count": Coalesce(
+                Subquery(reviews.annotate(total=Count("pk")).values("total")),
+                0,
+            ),
+        }
+
+    def refresh_genre_ids(self):
+        """Copy the genres of the titles into the 'genre_ids' column."""
+        quote = connection.ops.quote_name
+        through = Title.genre.through._meta.db_table
+        genres = (
+            f"SELECT genre_id FROM {quote(through)}"
+            f" WHERE title_id = {quote(Title._meta.db_table)}.id"
+        )
+        if connection.vendor == "postgresql":
+            ids = f"ARRAY({genres} ORDER BY genre_id)"
+        else:
+            ids = (
+                f"'{SEPARATOR}' || coalesce((SELECT group_concat(genre_id,"
+                f" '{SEPARATOR}') FROM ({genres} ORDER BY genre_id))"
+                f" || '{SEPARATOR}', '')"
+            )
+        self.update(genre_ids=RawSQL(ids, ()))
+        TitleRank.objects.sync(self)
+
+    def with_rating_drift(self):
+        """Titles whose stored rating aggregates disagree with reviews."""
+        return self.annotate(**self._actual_rating()).exclude(
+            rating_sum=F("actual_rating_sum"),
+            rating_count=F("actual_rating_count"),
+        )
+
+    def reconcile_ratings(self):
+        """Recalculate the stored rating aggregates from the reviews."""
+        actual = self._actual_rating()
+        return self.update(
+            rating_sum=actual["actual_rating_sum"],
+            rating_count=actual["actual_rating_count"],
+        )
+
+    def delete_reviews(self):
+        """Delete the reviews and comments of the titles, not loading them.
+
+        Their signals are not sent: the titles go too, and deleting a
+        title bumps the change counter of its reviews and comments.
+        """
+        reviews = Review.objects.filter(title_id__in=self.values("pk"))
+        Comment.objects.filter(
+            review_id__in=reviews.values("pk")
+        )._raw_delete(self.db)
+        reviews._raw_delete(self.db)
+
+    def delete(self):
+        """Delete the titles, their reviews and comments in few statements.
+
+        The deletion collector would load every review and comment.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.delete_reviews()
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Title(models.Model):
     """'Title' resource table settings."""
 
@@ -86,15 +261,145 @@ class Title(models.Model):
         verbose_name="Category",
         help_text="Select a category",
     )
+    rating_sum = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Sum of review scores",
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Number of reviews",
+    )
+    genre_ids = IdArrayField(verbose_name="Genre IDs")
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(
+                fields=("category", "year"), name="title_category_year_idx"
+            ),
+        ]
         verbose_name = "title"
         verbose_name_plural = "titles"
 
     def __str__(self):
         return self.name
 
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        """Save the title, an update leaves the derived columns alone.
+
+        Reviews and genre changes move them with queryset updates, the
+        values loaded with the instance may be stale by now.
+        """
+        if update_fields is None and not (
+            self._state.adding or force_insert
+        ):
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in DERIVED_TITLE_FIELDS
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic(using=using):
+            Title.objects.db_manager(using).filter(pk=self.pk).delete_reviews()
+            return super().delete(using, keep_parents)
+
+    @property
+    def rating(self):
+        """Average review score, 'None' if there are no reviews yet."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+class ReviewQuerySet(models.QuerySet):
+    """Queries of the 'Review' resource."""
+
+    def delete_comments(self):
+        """Delete the comments of the reviews, not loading them.
+
+        Their signals are not sent, deleting a review bumps the change
+        counter of the reviews of its title, comments included.
+        """
+        Comment.objects.filter(
+            review_id__in=self.values("pk")
+        )._raw_delete(self.db)
+
+    def delete(self):
+        """Delete the reviews and their comments.
+
+        The deletion collector would load every comment. The reviews are
+        loaded with the 'deleted_at' of their authors, the signals need
+        it to leave withdrawn scores alone.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.delete_comments()
+            reviews = self.annotate(author_deleted_at=F("author__deleted_at"))
+            return super(ReviewQuerySet, reviews).delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def withdraw(self, restore=False):
+        """Take the scores of the reviews out of the title ratings.
+
+        The histograms follow, with one update per title and score
+        instead of the signals of every review; 'restore' puts the scores
+        back. The reviews are hidden or shown again, their counters move.
+        """
+        sign = 1 if restore else -1
+        with transaction.atomic(using=self.db, savepoint=False):
+            ratings = {}
+            for title_id, score, count in (
+                self.order_by()
+                .values("title_id", "score")
+                .annotate(count=Count("pk"))
+                .values_list("title_id", "score", "count")
+            ):
+                total, number = ratings.get(title_id, (0, 0))
+                ratings[title_id] = (total + score * count, number + count)
+                TitleStats.objects.change_score(title_id, score, sign * count)
+            for title_id, (total, count) in ratings.items():
+                Title.objects.change_rating(
+                    title_id, sign * total, sign * count
+                )
+                bump_version(reviews_of(title_id))
+            if ratings:
+                bump_version(CATALOGUE)
+
+    withdraw.alters_data = True
+
+    def purge(self):
+        """Delete a batch of reviews and comments, the number of reviews.
+
+        The scores must be withdrawn from the title ratings already, as
+        'User.soft_delete' does.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(
+                self.select_for_update().values_list("pk", "title_id")
+            )
+            reviews = Review.objects.filter(pk__in=[row[0] for row in rows])
+            reviews.delete_comments()
+            reviews._raw_delete(reviews.db)
+            for title_id in {row[1] for row in rows}:
+                bump_version(reviews_of(title_id))
+        return len(rows)
+
+    purge.alters_data = True
+
 
 class Review(models.Model):
     """'Review' resource table settings."""
@@ -125,19 +430,143 @@ class Review(models.Model):
         verbose_name="Review date", auto_now_add=True, db_index=True
     )
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
-        ordering = ("pub_date",)
+        ordering = ("pub_date", "id")
         constraints = [
             models.UniqueConstraint(
                 fields=("title", "author"), name="unique_review"
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=("title", "pub_date", "id"),
+                name="review_title_pub_date_idx",
+            ),
+        ]
         verbose_name = "review"
         verbose_name_plural = "reviews"
 
     def __str__(self):
         return self.text[: settings.NUM_CHAR]
 
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic(using=using):
+            Review.objects.db_manager(using).filter(
+                pk=self.pk
+            ).delete_comments()
+            return super().delete(using, keep_parents)
+
+    def save(self, *args, **kwargs):
+        """Save the review and move its score into the title rating.
+
+        The score histogram of 'TitleStats' follows the same changes. A
+        new review of a missing title raises 'Title.DoesNotExist', a
+        second one of the author the 'IntegrityError' of 'unique_review'.
+        Scores of soft-deleted authors stay out, 'User.restore' brings
+        them back as saved.
+        """
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Review.objects.select_for_update(of=("self",))
+                    .filter(pk=self.pk)
+                    .values_list("title_id", "score", "author__deleted_at")
+                    .first()
+                )
+            if previous is None:
+                # The rating update of a new review locks the title row
+                # and finds out whether it exists, before the insert.
+                withdrawn = self.is_withdrawn()
+                rated, counted = self.add_score(withdrawn)
+                if not rated:
+                    raise Title.DoesNotExist(
+                        f"Title {self.title_id} does not exist."
+                    )
+            else:
+                withdrawn = previous[2] is not None
+            super().save(*args, **kwargs)
+            if withdrawn:
+                return
+            if previous is None:
+                if not counted:
+                    TitleStats.objects.change_score(
+                        self.title_id, self.score, 1
+                    )
+            elif previous[:2] != (self.title_id, self.score):
+                self.move_score(*previous[:2])
+
+    def is_withdrawn(self):
+        """Whether the author is soft-deleted and the score left the rating.
+
+        'ReviewQuerySet.delete' loads it with the review, other reviews
+        read it from the author.
+        """
+        if hasattr(self, "author_deleted_at"):
+            return self.author_deleted_at is not None
+        return self.author.deleted_at is not None
+
+    def add_score(self, withdrawn):
+        """Count the score of a new review, as 'TitleQuerySet.add_score'.
+
+        A withdrawn score stays out, only the title is looked up.
+        """
+        if withdrawn:
+            return Title.objects.filter(pk=self.title_id).exists(), True
+        return Title.objects.add_score(self.title_id, self.score)
+
+    @classmethod
+    def is_duplicate(cls, error):
+        """Whether the 'IntegrityError' comes from 'unique_review'."""
+        diag = getattr(error.__cause__, "diag", None)
+        if diag is not None:
+            return diag.constraint_name == "unique_review"
+        # SQLite names the columns of the constraint instead.
+        table = cls._meta.db_table
+        return ", ".join(
+            f"{table}.{cls._meta.get_field(name).column}"
+            for name in ("title", "author")
+        ) in str(error)
+
+    def move_score(self, title_id, score):
+        """Move the previous score of the review to the saved one."""
+        if title_id != self.title_id:
+            Title.objects.change_rating(title_id, -score, -1)
+            Title.objects.change_rating(self.title_id, self.score, 1)
+            bump_version(reviews_of(title_id))
+        else:
+            Title.objects.change_rating(self.title_id, self.score - score, 0)
+        TitleStats.objects.change_score(title_id, score, -1)
+        TitleStats.objects.change_score(self.title_id, self.score, 1)
+
+
+class CommentQuerySet(models.QuerySet):
+    """Queries of the 'Comment' resource."""
+
+    def bump_versions(self):
+        """Bump the change counters of the reviews of the comments."""
+        for review_id in self.order_by().values_list(
+            "review_id", flat=True
+        ).distinct():
+            bump_version(comments_of(review_id))
+
+    def purge(self):
+        """Delete a batch of comments without signals, their number."""
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(
+                self.select_for_update().values_list("pk", "review_id")
+            )
+            Comment.objects.filter(
+                pk__in=[row[0] for row in rows]
+            )._raw_delete(self.db)
+            for review_id in {row[1] for row in rows}:
+                bump_version(comments_of(review_id))
+        return len(rows)
+
+    purge.alters_data = True
+
 
 class Comment(models.Model):
     """'Comment' resource table settings."""
@@ -160,10 +589,322 @@ class Comment(models.Model):
         verbose_name="Comment date", auto_now_add=True, db_index=True
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
-        ordering = ("pub_date",)
+        ordering = ("pub_date", "id")
+        indexes = [
+            models.Index(
+                fields=("review", "pub_date", "id"),
+                name="comment_review_pub_date_idx",
+            ),
+        ]
         verbose_name = "comment"
         verbose_name_plural = "comments"
 
     def __str__(self):
         return self.text[: settings.NUM_CHAR]
+
+
+class TitleStatsQuerySet(models.QuerySet):
+    """Queries of the precomputed review statistics."""
+
+    def rebuild(self, title_ids):
+        """Recount the score histograms of the titles from the reviews.
+
+        The reviews are read from the primary, the rebuilt rows are
+        written there.
+        """
+        histograms = {title_id: {} for title_id in title_ids}
+        for title_id, score, number in (
+            Review.objects.using(DEFAULT_DB_ALIAS)
+            .filter(
+                title_id__in=histograms, author__deleted_at__isnull=True
+            )
+            .order_by()
+            .values("title_id", "score")
+            .annotate(number=Count("pk"))
+            .values_list("title_id", "score", "number")
+        ):
+            histograms[title_id][TitleStats.score_field(score)] = number
+        with transaction.atomic():
+            self.filter(title_id__in=histograms).delete()
+            self.bulk_create(
+                TitleStats(title_id=title_id, **histogram)
+                for title_id, histogram in histograms.items()
+            )
+
+    def change_score(self, title_id, score, delta):
+        """Add 'delta' reviews with the score to the title histogram.
+
+        A missing row is rebuilt from the reviews table, which already
+        holds the saved review; a missing row is left for the next read
+        when a review is deleted, its title may be deleted as well.
+        """
+        field = TitleStats.score_field(score)
+        changes = {field: F(field) + delta}
+        if self.filter(title_id=title_id).update(**changes) or delta < 0:
+            return
+        try:
+            self.rebuild([title_id])
+        except IntegrityError:
+            # Rebuilt concurrently without this uncommitted review.
+            self.filter(title_id=title_id).update(**changes)
+
+    def for_title(self, title_id):
+        """Statistics of an existing title, built on the first read."""
+        try:
+            return self.get(title_id=title_id)
+        except TitleStats.DoesNotExist:
+            pass
+        try:
+            self.rebuild([title_id])
+        except IntegrityError:
+            # Built by a concurrent request.
+            pass
+        return self.get(title_id=title_id)
+
+
+class TitleStats(models.Model):
+    """Score histogram of the title reviews, kept up to date on writes."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Title ID",
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    objects = TitleStatsQuerySet.as_manager()
+
+    SCORES = range(1, 11)
+
+    class Meta:
+        verbose_name = "title statistics"
+        verbose_name_plural = "title statistics"
+
+    def __str__(self):
+        return f"Statistics of title {self.title_id}"
+
+    @staticmethod
+    def score_field(score):
+        return f"score_{score}"
+
+    @property
+    def histogram(self):
+        """Number of reviews by score, from 1 to 10."""
+        return {
+            score: getattr(self, self.score_field(score))
+            for score in self.SCORES
+        }
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        total = sum(score * number for score, number in self.histogram.items())
+        return round(total / count, 2)
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle = [(count - 1) // 2, count // 2]
+        values, seen = [], 0
+        for score, number in self.histogram.items():
+            seen += number
+            while middle and middle[0] < seen:
+                values.append(score)
+                middle.pop(0)
+        return sum(values) / 2
+
+
+class TitleRankQuerySet(models.QuerySet):
+    """Queries of the materialized leaderboard of the titles."""
+
+    def prior_mean(self):
+        """Mean score of all reviews, the prior of the Bayesian average.
+
+        Kept in the shared cache; 'rebuild' computes it again.
+        """
+        prior = cache.get(RANKING_PRIOR_KEY)
+        if prior is None:
+            totals = Title.objects.aggregate(
+                total=Sum("rating_sum"), count=Sum("rating_count")
+            )
+            prior = (
+                totals["total"] / totals["count"] if totals["count"]
+                else DEFAULT_PRIOR_MEAN
+            )
+            cache.set(RANKING_PRIOR_KEY, prior, timeout=None)
+        return prior
+
+    def ranks(self, titles, prior):
+        """Unsaved ranks of the rated titles of 'RANKED_TITLE_FIELDS' rows."""
+        weight = settings.RANKING_PRIOR_WEIGHT
+        ranks = []
+        for title_id, total, count, category_id, year, genre_ids in titles:
+            if count:
+                ranks.append(
+                    TitleRank(
+                        title_id=title_id,
+                        score=(weight * prior + total) / (weight + count),
+                        rating_count=count,
+                        category_id=category_id,
+                        year=year,
+                        genre_ids=genre_ids,
+                    )
+                )
+        return ranks
+
+    def refresh_on_commit(self, title_ids):
+        """Rank the titles again once the current transaction commits.
+
+        The leaderboard is derived data, the writes of the transaction
+        do not wait for it.
+        """
+        transaction.on_commit(lambda: self.refresh(title_ids))
+
+    def refresh(self, title_ids):
+        """Rank the titles again from their stored rating aggregates.
+
+        Titles without reviews leave the leaderboard. Ranks of titles
+        that stay rated take a single update.
+        """
+        title_ids = set(title_ids)
+        prior = self.prior_mean()
+        if self.rescore(title_ids, prior) == len(title_ids):
+            return
+        titles = Title.objects.filter(pk__in=title_ids).values_list(
+            *RANKED_TITLE_FIELDS
+        )
+        ranks = self.ranks(titles, prior)
+        ranked = {rank.title_id for rank in ranks}
+        unranked = [
+            title_id for title_id in title_ids if title_id not in ranked
+        ]
+        if unranked:
+            self.filter(title_id__in=unranked).delete()
+        for rank in ranks:
+            values = {
+                field: getattr(rank, field) for field in RANKED_FIELDS
+            }
+            if self.filter(title_id=rank.title_id).update(**values):
+                continue
+            try:
+                with transaction.atomic():
+                    rank.save(force_insert=True)
+            except IntegrityError:
+                # Created concurrently.
+                self.filter(title_id=rank.title_id).update(**values)
+
+    def rescore(self, title_ids, prior):
+        """Score the existing ranks of rated titles in place, their number."""
+        title = Title.objects.filter(pk=OuterRef("pk")).order_by()
+        total = Subquery(title.values("rating_sum")[:1])
+        count = Subquery(title.values("rating_count")[:1])
+        weight = settings.RANKING_PRIOR_WEIGHT
+        score = (Value(weight * float(prior)) + total) / (weight + count)
+        return self.filter(
+            title_id__in=title_ids, title__rating_count__gt=0
+        ).update(
+            score=ExpressionWrapper(score, output_field=models.FloatField()),
+            rating_count=count,
+        )
+
+    def sync(self, titles):
+        """Copy category, year and genres of the titles into their ranks."""
+        title = Title.objects.filter(pk=OuterRef("pk")).order_by()
+        return self.filter(title_id__in=titles.values("pk")).update(
+            **{
+                field: Subquery(title.values(field)[:1])
+                for field in ("category_id", "year", "genre_ids")
+            }
+        )
+
+    def rebuild(self, batch_size=1000):
+        """Rank all the titles again with a new prior mean."""
+        cache.delete(RANKING_PRIOR_KEY)
+        prior = self.prior_mean()
+        titles = (
+            Title.objects.filter(rating_count__gt=0)
+            .order_by()
+            .values_list(*RANKED_TITLE_FIELDS)
+        )
+        with transaction.atomic():
+            self.all().delete()
+            batch = []
+            for row in titles.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) == batch_size:
+                    self.bulk_create(self.ranks(batch, prior))
+                    batch = []
+            self.bulk_create(self.ranks(batch, prior))
+
+
+class TitleRank(models.Model):
+    """Bayesian average score of a rated title, for the leaderboard.
+
+    The average is pulled towards the mean score of all reviews by
+    'RANKING_PRIOR_WEIGHT' virtual reviews, so a title with few reviews
+    can not outrank well reviewed ones. Category, year and genres are
+    copied from the title, every leaderboard filter is an index range.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rank",
+        verbose_name="Title ID",
+    )
+    score = models.FloatField(verbose_name="Bayesian average score")
+    rating_count = models.PositiveIntegerField(
+        verbose_name="Number of reviews"
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Category",
+    )
+    year = models.PositiveIntegerField(verbose_name="Release year")
+    genre_ids = IdArrayField(verbose_name="Genre IDs")
+
+    objects = TitleRankQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("-score", "title")
+        indexes = [
+            models.Index(fields=("-score", "title"), name="rank_score_idx"),
+            models.Index(
+                fields=("category", "-score", "title"),
+                name="rank_category_score_idx",
+            ),
+            models.Index(
+                fields=("year", "-score", "title"), name="rank_year_score_idx"
+            ),
+        ]
+        verbose_name = "title rank"
+        verbose_name_plural = "title ranks"
+
+    def __str__(self):
+        return f"Rank of title {self.title_id}"
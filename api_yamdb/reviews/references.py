@@ -0,0 +1,137 @@
+"""Per process copies of the categories and genres.
+
+The tables are small and rarely change, so every process keeps all their
+rows by id and by slug. 'refresh' compares the copies with the change
+counters of the shared cache once per request, a stale copy is loaded
+again when it is next used; a change made by any worker, the API or the
+admin site reaches all of them. A key missing from a copy reloads it
+only if its counter moved meanwhile, the counter of a change is bumped
+once its transaction commits; otherwise the key is remembered as
+missing until the next change. The rows are read from the primary, a
+replica behind the counter would keep the copy stale until the next
+change.
+"""
+
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS
+from reviews.models import Category, Genre
+from reviews.versions import (
+    CATEGORIES,
+    GENRES,
+    get_state,
+    get_version,
+    state_keys,
+)
+
+Snapshot = namedtuple("Snapshot", "version by_pk by_slug position missing")
+
+# Keys remembered as missing by a copy, a flood of unknown slugs can not
+# grow it further.
+MISSING_KEYS_LIMIT = 1000
+
+
+class ReferenceCache:
+    """All rows of a reference model as of one version of its counter."""
+
+    def __init__(self, model, version_name):
+        self.model = model
+        self.version_name = version_name
+        self.version = None
+        self.snapshot = None
+
+    def load(self):
+        rows = list(self.model.objects.using(DEFAULT_DB_ALIAS))
+        self.snapshot = Snapshot(
+            self.version,
+            {row.pk: row for row in rows},
+            {row.slug: row for row in rows},
+            {row.pk: position for position, row in enumerate(rows)},
+            set(),
+        )
+        return self.snapshot
+
+    def refresh(self, version):
+        """Note the counter, a copy of another version reloads on use."""
+        self.version = version
+
+    def current(self):
+        if self.snapshot is None or self.snapshot.version != self.version:
+            return self.load()
+        return self.snapshot
+
+    def lookup(self, index, keys):
+        """The copy holding every key if the database has them."""
+        snapshot = self.current()
+        rows = getattr(snapshot, index)
+        unknown = {
+            (index, key)
+            for key in keys
+            if key not in rows and (index, key) not in snapshot.missing
+        }
+        if not unknown:
+            return snapshot
+        self.version = get_version(self.version_name)
+        if self.version != snapshot.version:
+            return self.load()
+        if len(snapshot.missing) + len(unknown) > MISSING_KEYS_LIMIT:
+            snapshot.missing.clear()
+        snapshot.missing.update(unknown)
+        return snapshot
+
+    def get(self, pk):
+        """The row with the id, 'None' if there is none."""
+        return self.lookup("by_pk", (pk,)).by_pk.get(pk)
+
+    def ordered(self, pks):
+        """Rows with the ids in the model ordering, missing ids skipped."""
+        snapshot = self.lookup("by_pk", pks)
+        return [
+            snapshot.by_pk[pk]
+            for pk in sorted(
+                (pk for pk in pks if pk in snapshot.by_pk),
+                key=snapshot.position.__getitem__,
+            )
+        ]
+
+    def ids(self, slugs):
+        """Ids of the rows by slug, unknown slugs left out."""
+        snapshot = self.lookup("by_slug", slugs)
+        return {
+            slug: snapshot.by_slug[slug].pk
+            for slug in slugs
+            if slug in snapshot.by_slug
+        }
+
+    def by_slug(self, slug):
+        """The row with the slug, 'None' if there is none."""
+        return self.lookup("by_slug", (slug,)).by_slug.get(slug)
+
+
+STATE_KEYS = state_keys((CATEGORIES, GENRES))
+
+categories = ReferenceCache(Category, CATEGORIES)
+genres = ReferenceCache(Genre, GENRES)
+
+
+def refresh(values=None):
+    """Note the counters of the copies, one shared cache read.
+
+    'values' are the entries of 'STATE_KEYS' if they were read already.
+    """
+    versions, _ = get_state((CATEGORIES, GENRES), values)
+    categories.refresh(versions[0])
+    genres.refresh(versions[1])
+
+
+def load():
+    """Bring both copies up to date now instead of on the next use."""
+    refresh()
+    categories.current()
+    genres.current()
+
+
+def clear():
+    """Drop the copies, they are loaded again on the next use."""
+    categories.snapshot = None
+    genres.snapshot = None
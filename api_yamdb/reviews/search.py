@@ -0,0 +1,125 @@
+"""Indexed full-text and fuzzy search of titles.
+
+PostgreSQL keeps a generated 'tsvector' column with a GIN index and a
+trigram GIN index on the name, both maintained by the database itself.
+SQLite keeps an FTS5 table with the trigram tokenizer, synchronised on
+title writes by 'update_search_index' and 'remove_from_search_index'.
+Both are created by the migration '0005_title_search_index'.
+"""
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "simple"
+SQLITE_SEARCH_TABLE = "reviews_title_search"
+
+
+def _search_postgresql(queryset, query):
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    table = queryset.model._meta.db_table
+    tsquery = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+    return queryset.annotate(
+        search_match=RawSQL(
+            f"{table}.search_vector @@ {tsquery}",
+            (query,),
+            output_field=BooleanField(),
+        ),
+        search_rank=RawSQL(
+            f"ts_rank({table}.search_vector, {tsquery})",
+            (query,),
+            output_field=FloatField(),
+        )
+        + TrigramSimilarity("name", query),
+    ).filter(
+        Q(search_match=True) | Q(name__trigram_similar=query)
+    ).order_by("-search_rank", "name")
+
+
+def _trigrams(query):
+    trigrams = []
+    for word in query.lower().split():
+        for start in range(len(word) - 2):
+            trigram = word[start:start + 3].replace('"', '""')
+            if f'"{trigram}"' not in trigrams:
+                trigrams.append(f'"{trigram}"')
+    return trigrams
+
+
+def _search_sqlite(queryset, query):
+    trigrams = _trigrams(query)
+    if not trigrams:
+        return queryset.filter(name__icontains=query)
+    match = " OR ".join(trigrams)
+    table = queryset.model._meta.db_table
+    return queryset.annotate(
+        search_match=RawSQL(
+            f"{table}.id IN (SELECT rowid FROM {SQLITE_SEARCH_TABLE}"
+            f" WHERE {SQLITE_SEARCH_TABLE} MATCH %s)",
+            (match,),
+            output_field=BooleanField(),
+        ),
+        search_rank=RawSQL(
+            f"SELECT bm25({SQLITE_SEARCH_TABLE}) FROM {SQLITE_SEARCH_TABLE}"
+            f" WHERE {SQLITE_SEARCH_TABLE} MATCH %s"
+            f" AND {SQLITE_SEARCH_TABLE}.rowid = {table}.id",
+            (match,),
+            output_field=FloatField(),
+        ),
+    ).filter(search_match=True).order_by(F("search_rank").asc(), "name")
+
+
+def update_search_index(titles):
+    """Write the name and the description of the titles to the index."""
+    if connection.vendor != "sqlite":
+        return
+    remove_from_search_index([title.pk for title in titles])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, name, description)"
+            " VALUES (%s, %s, %s)",
+            [
+                (title.pk, title.name, title.description or "")
+                for title in titles
+            ],
+        )
+
+
+def remove_from_search_index(title_ids):
+    """Drop the titles from the index."""
+    if connection.vendor != "sqlite" or not title_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SQLITE_SEARCH_TABLE} WHERE rowid IN"
+            f" ({', '.join(['%s'] * len(title_ids))})",
+            list(title_ids),
+        )
+
+
+def rebuild_search_index():
+    """Index all titles again, for example after a raw data import."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SQLITE_SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, name, description)"
+            " SELECT id, name, coalesce(description, '') FROM reviews_title"
+        )
+
+
+def search_titles(queryset, query):
+    """Titles matching the query, the most relevant first.
+
+    Matches words of the name and the description and tolerates typos
+    through trigram similarity.
+    """
+    if connection.vendor == "postgresql":
+        return _search_postgresql(queryset, query)
+    if connection.vendor == "sqlite":
+        return _search_sqlite(queryset, query)
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    )
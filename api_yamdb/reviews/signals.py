@@ -0,0 +1,138 @@
+"""Signal handlers of the 'Reviews' application."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRank,
+    TitleStats,
+)
+from reviews.search import remove_from_search_index, update_search_index
+from reviews.versions import (
+    CATALOGUE,
+    CATEGORIES,
+    GENRES,
+    USERS,
+    bump_version,
+    comments_of,
+    reviews_of,
+)
+from users.models import User
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating(sender, instance, **kwargs):
+    """Take the score of a deleted review out of the title rating.
+
+    Runs inside the transaction of the deletion, including cascades
+    and bulk deletes from the admin site. Scores of deleted users left
+    the rating already.
+    """
+    if instance.is_withdrawn():
+        return
+    Title.objects.change_rating(instance.title_id, -instance.score, -1)
+    TitleStats.objects.change_score(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_catalogue_version(sender, **kwargs):
+    """Invalidate cached catalogue responses on any catalogue write."""
+    bump_version(CATALOGUE)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_title_genre_ids(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Keep 'Title.genre_ids' in line with the genres of the title."""
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    if not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        titles = Title.objects.filter(pk__in=pk_set)
+    else:
+        titles = Title.objects.filter(genre_ids__contains_any=[instance.pk])
+    titles.refresh_genre_ids()
+
+
+@receiver(post_delete, sender=Genre)
+def drop_deleted_genre_ids(sender, instance, **kwargs):
+    """Drop the deleted genre from 'Title.genre_ids'."""
+    Title.objects.filter(
+        genre_ids__contains_any=[instance.pk]
+    ).refresh_genre_ids()
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    """Keep the search index in line with the saved title."""
+    update_search_index((instance,))
+
+
+@receiver(post_save, sender=Title)
+def sync_title_rank(sender, instance, created, **kwargs):
+    """Copy the category and year of the saved title into its rank."""
+    if not created:
+        TitleRank.objects.sync(Title.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    """Drop the deleted title from the search index."""
+    remove_from_search_index((instance.pk,))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_categories_version(sender, **kwargs):
+    bump_version(CATEGORIES)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def bump_genres_version(sender, **kwargs):
+    bump_version(GENRES)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_reviews_version(sender, instance, **kwargs):
+    bump_version(reviews_of(instance.title_id))
+
+
+@receiver(post_delete, sender=Title)
+def bump_deleted_reviews_version(sender, instance, **kwargs):
+    """The reviews and comments of the title are deleted without signals."""
+    bump_version(reviews_of(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comments_version(sender, instance, **kwargs):
+    bump_version(comments_of(instance.review_id))
+
+
+@receiver(post_save, sender=User)
+def bump_users_version(sender, instance, created, **kwargs):
+    """Reviews and comments show the username of their authors.
+
+    Only renaming changes them; the reviews and comments of deleted users
+    move their own counters.
+    """
+    username = instance.__dict__.get("username")
+    if not created and username != instance.loaded_username:
+        bump_version(USERS)
+    instance.loaded_username = username
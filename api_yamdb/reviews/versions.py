@@ -0,0 +1,87 @@
+"""Change counters of the catalogue resources kept in the shared cache."""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOGUE = "catalogue"
+CATEGORIES = "categories"
+GENRES = "genres"
+USERS = "users"
+
+
+def reviews_of(title_id):
+    return f"reviews:{title_id}"
+
+
+def comments_of(review_id):
+    return f"comments:{review_id}"
+
+
+def version_key(name):
+    return f"version:{name}"
+
+
+def modified_key(name):
+    return f"modified:{name}"
+
+
+def _initial_version():
+    # An evicted counter must never restart at a value that still has
+    # cached entries, so a fresh counter starts from the current time.
+    return time.time_ns()
+
+
+def get_version(name):
+    """Current value of the change counter."""
+    key = version_key(name)
+    version = cache.get(key)
+    if version is not None:
+        return version
+    # Changes made before the counter existed are unknown, so the
+    # resource is treated as modified now.
+    cache.add(modified_key(name), time.time(), timeout=None)
+    cache.add(key, _initial_version(), timeout=None)
+    return cache.get(key)
+
+
+def state_keys(names):
+    """Cache keys read by 'get_state'."""
+    return [version_key(name) for name in names] + [
+        modified_key(name) for name in names
+    ]
+
+
+def get_state(names, values=None):
+    """Versions of the counters and the time of the latest change.
+
+    The time is 'None' when it is not known for one of the counters.
+    'values' are the entries of 'state_keys' if they were read already.
+    """
+    if values is None:
+        values = cache.get_many(state_keys(names))
+    versions = tuple(
+        values.get(version_key(name)) or get_version(name) for name in names
+    )
+    modified = [values.get(modified_key(name)) for name in names]
+    last_modified = None if None in modified else max(modified)
+    return versions, last_modified
+
+
+def _increment(name):
+    key = version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+    cache.set(modified_key(name), time.time(), timeout=None)
+
+
+def bump_version(name):
+    """Increase the change counter once the current transaction commits.
+
+    Bumping before the commit would let a concurrent reader cache the
+    old rows under the new version.
+    """
+    transaction.on_commit(lambda: _increment(name))
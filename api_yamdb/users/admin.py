@@ -1,7 +1,9 @@
 """Admin site settings of the 'Users' application."""
 
 from django.contrib import admin
-from users.models import User
+from django.db import transaction
+from reviews.models import Review
+from users.models import EmailOutbox, User
 
 
 @admin.register(User)
@@ -19,4 +21,36 @@ class UserAdmin(admin.ModelAdmin):
     )
     list_editable = ("role",)
     search_fields = ("username",)
-    list_filter = ("role",)
+    list_filter = ("role", "is_active")
+    # Cleared by the restore action, which puts the scores back.
+    readonly_fields = ("deleted_at",)
+    actions = ("restore",)
+
+    def restore(self, request, queryset):
+        for user in queryset.filter(deleted_at__isnull=False):
+            user.restore()
+
+    restore.short_description = "Restore deleted users"
+
+    def delete_queryset(self, request, queryset):
+        """Delete the reviews first, see 'User.delete'."""
+        with transaction.atomic():
+            Review.objects.filter(author__in=queryset).delete()
+            super().delete_queryset(request, queryset)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Table settings for resource 'Email outbox' on the admin site."""
+
+    list_display = (
+        "pk",
+        "recipient",
+        "subject",
+        "created",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    search_fields = ("recipient",)
+    list_filter = ("sent_at",)
@@ -0,0 +1,101 @@
+"""Delete soft-deleted users with their reviews and comments."""
+
+import time
+from argparse import ArgumentTypeError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.models import Comment, Review
+from users.models import User
+
+
+def positive(convert):
+    """Argument type of numbers above zero, converted with 'convert'."""
+
+    def parse(value):
+        number = convert(value)
+        if number <= 0:
+            raise ArgumentTypeError(f"must be above zero, not {value}")
+        return number
+
+    return parse
+
+
+class Command(BaseCommand):
+    """Purge deleted users in small batches under a write rate."""
+
+    help = "Delete the reviews, comments and accounts of deleted users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=positive(int),
+            default=100,
+            help="Reviews or comments deleted in one transaction.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=positive(float),
+            default=settings.USER_PURGE_RATE,
+            help="Most reviews and comments deleted per second.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Pause between polls when no user is waiting.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as every deleted user is purged.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            user = (
+                User.objects.filter(deleted_at__isnull=False)
+                .order_by("deleted_at", "pk")
+                .first()
+            )
+            if user is not None:
+                self.purge(user, options)
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
+
+    def purge(self, user, options):
+        """Delete the rows of the user batch by batch, then the account.
+
+        Comments on the reviews of the user go before the reviews, so no
+        batch deletes an unbounded number of them.
+        """
+        # Restored by an admin in the meantime, the rest is kept.
+        account = User.objects.filter(pk=user.pk, deleted_at__isnull=False)
+        purged = 0
+        for queryset in (
+            Comment.objects.filter(author__in=account),
+            Comment.objects.filter(review__author__in=account),
+            Review.objects.filter(author__in=account),
+        ):
+            while True:
+                started = time.monotonic()
+                deleted = queryset.order_by("pk")[
+                    :options["batch_size"]
+                ].purge()
+                if not deleted:
+                    break
+                purged += deleted
+                self.throttle(deleted, started, options["rate"])
+        account.delete()
+        self.stdout.write(
+            f"Purged user {user.username}: {purged} reviews and comments."
+        )
+
+    def throttle(self, deleted, started, rate):
+        """Sleep to keep the deletes at most 'rate' rows per second."""
+        delay = deleted / rate - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,132 @@
+"""Deliver messages of the email outbox."""
+
+import time
+from contextlib import suppress
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    """Drain the email outbox in batches over one mail connection."""
+
+    help = "Send pending outbox emails with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Messages claimed and sent at once.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Delivery attempts before a message is given up.",
+        )
+        parser.add_argument(
+            "--backoff",
+            type=int,
+            default=30,
+            help="Delay before the first retry, doubled on each attempt.",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=300,
+            help="Seconds a claimed message is hidden from other workers.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Pause between polls of an empty outbox.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the outbox is drained.",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        while True:
+            batch = self.claim(options["batch_size"], options["lease"])
+            if batch:
+                self.deliver(connection, batch, options)
+                continue
+            connection.close()
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
+
+    def claim(self, size, lease):
+        """Lock a batch of due messages and hide it for the lease time.
+
+        The lease lets a message be retried if the worker dies while
+        sending, without holding row locks during the SMTP conversation.
+        """
+        with transaction.atomic():
+            ids = list(
+                EmailOutbox.objects.pending()
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:size]
+            )
+            EmailOutbox.objects.filter(pk__in=ids).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=lease)
+            )
+        return list(EmailOutbox.objects.filter(pk__in=ids))
+
+    def deliver(self, connection, batch, options):
+        try:
+            connection.open()
+        except Exception as error:
+            # The relay is down, every message of the batch waits for it.
+            for outgoing in batch:
+                self.retry_later(outgoing, error, options)
+            self.stderr.write(f"Mail connection failed: {error}")
+            return
+        sent = []
+        for outgoing in batch:
+            try:
+                connection.send_messages(
+                    (
+                        EmailMessage(
+                            subject=outgoing.subject,
+                            body=outgoing.message,
+                            from_email=outgoing.from_email,
+                            to=(outgoing.recipient,),
+                        ),
+                    )
+                )
+            except Exception as error:
+                self.retry_later(outgoing, error, options)
+                # The session may be dead, the next message reconnects.
+                with suppress(Exception):
+                    connection.close()
+            else:
+                sent.append(outgoing.pk)
+        EmailOutbox.objects.filter(pk__in=sent).update(
+            sent_at=timezone.now(), next_attempt_at=None
+        )
+        self.stdout.write(f"Sent {len(sent)} of {len(batch)} emails.")
+
+    def retry_later(self, outgoing, error, options):
+        outgoing.attempts += 1
+        outgoing.last_error = repr(error)
+        if outgoing.attempts >= options["max_attempts"]:
+            outgoing.next_attempt_at = None
+            self.stderr.write(f"Gave up sending email {outgoing.pk}: {error}")
+        else:
+            outgoing.next_attempt_at = timezone.now() + timedelta(
+                seconds=options["backoff"] * 2 ** (outgoing.attempts - 1)
+            )
+        outgoing.save(
+            update_fields=("attempts", "last_error", "next_attempt_at")
+        )
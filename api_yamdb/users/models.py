@@ -1,7 +1,8 @@
 """Database settings of the 'Users' application."""
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -20,15 +21,72 @@ class User(AbstractUser):
     )
     email = models.EmailField(unique=True)
     bio = models.TextField("Biography", blank=True)
+    deleted_at = models.DateTimeField("Deleted", null=True, blank=True)
 
     class Meta:
         ordering = ("username",)
+        indexes = [
+            models.Index(
+                fields=("deleted_at",),
+                name="user_deleted_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
         verbose_name = "user"
         verbose_name_plural = "users"
 
+    # Username as loaded from the database, reviews and comments show it.
+    loaded_username = None
+
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user.loaded_username = user.__dict__.get("username")
+        return user
+
+    def delete(self, using=None, keep_parents=False):
+        """Delete the user, the reviews first with one query of the author.
+
+        The deletion collector would read the author of every review.
+        """
+        with transaction.atomic(using=using):
+            self.review_set.using(using).delete()
+            return super().delete(using, keep_parents)
+
+    def soft_delete(self):
+        """Deactivate the account and queue it for the purge worker.
+
+        The user can not sign in any more and is hidden from the API with
+        the reviews and comments, the review scores leave the title
+        ratings at once. 'purge_deleted_users' deletes the rows later.
+        """
+        with transaction.atomic():
+            if not User.objects.select_for_update().filter(
+                pk=self.pk, deleted_at__isnull=True
+            ).exists():
+                return
+            self.is_active = False
+            self.deleted_at = timezone.now()
+            self.save(update_fields=("is_active", "deleted_at"))
+            self.review_set.withdraw()
+            self.comment_set.bump_versions()
+
+    def restore(self):
+        """Undo 'soft_delete' of a user that is not purged yet."""
+        with transaction.atomic():
+            if not User.objects.select_for_update().filter(
+                pk=self.pk, deleted_at__isnull=False
+            ).exists():
+                return
+            self.is_active = True
+            self.deleted_at = None
+            self.save(update_fields=("is_active", "deleted_at"))
+            self.review_set.withdraw(restore=True)
+            self.comment_set.bump_versions()
+
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
@@ -36,3 +94,46 @@ class User(AbstractUser):
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_staff or self.is_superuser
+
+
+class EmailOutboxQuerySet(models.QuerySet):
+    """Queries of the email outbox."""
+
+    def pending(self):
+        """Unsent messages due for a delivery attempt."""
+        return self.filter(
+            sent_at__isnull=True, next_attempt_at__lte=timezone.now()
+        )
+
+
+class EmailOutbox(models.Model):
+    """Email message waiting to be delivered by the outbox worker."""
+
+    subject = models.CharField("Subject", max_length=256)
+    message = models.TextField("Message")
+    from_email = models.CharField("Sender", max_length=254)
+    recipient = models.EmailField("Recipient")
+    created = models.DateTimeField("Created", auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField("Attempts", default=0)
+    next_attempt_at = models.DateTimeField(
+        "Next attempt", default=timezone.now, null=True
+    )
+    sent_at = models.DateTimeField("Sent", null=True, blank=True)
+    last_error = models.TextField("Last error", blank=True)
+
+    objects = EmailOutboxQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("next_attempt_at", "id")
+        indexes = [
+            models.Index(
+                fields=("next_attempt_at",),
+                name="emailoutbox_pending_idx",
+                condition=models.Q(sent_at__isnull=True),
+            ),
+        ]
+        verbose_name = "outgoing email"
+        verbose_name_plural = "outgoing emails"
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
@@ -0,0 +1,13 @@
+"""Signal handlers of the 'Users' application."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import User
+from users.snapshots import forget_user_snapshot
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """Role, flags or the profile of the user changed."""
+    forget_user_snapshot(instance.pk)
@@ -0,0 +1,44 @@
+"""Short-lived cached snapshots of users for request authentication."""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+
+from users.models import User
+
+# The password hash is never cached; it stays deferred on the snapshot.
+SNAPSHOT_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname != "password"
+)
+
+
+def snapshot_key(user_id):
+    return f"user-snapshot:{user_id}"
+
+
+def get_user_snapshot(user_id):
+    """User restored from the cache, 'None' if it is not cached."""
+    values = cache.get(snapshot_key(user_id))
+    if values is None:
+        return None
+    return User.from_db(router.db_for_read(User), SNAPSHOT_FIELDS, values)
+
+
+def store_user_snapshot(user):
+    cache.set(
+        snapshot_key(user.pk),
+        [getattr(user, attname) for attname in SNAPSHOT_FIELDS],
+        settings.USER_SNAPSHOT_TIMEOUT,
+    )
+
+
+def forget_user_snapshot(user_id):
+    """Drop the snapshot now and once more after the transaction commits.
+
+    The second delete removes a snapshot cached by a concurrent request
+    from the rows that were not committed yet.
+    """
+    cache.delete(snapshot_key(user_id))
+    transaction.on_commit(lambda: cache.delete(snapshot_key(user_id)))
@@ -0,0 +1,279 @@
+"""Latency, query count and memory baselines of the api/v1 endpoints.
+
+Opt-in, run separately from the other tests:
+
+    BENCHMARK=1 pytest tests/benchmarks -s
+
+The dataset is built by the 'generate_dataset' command, its size is set
+by BENCHMARK_USERS, BENCHMARK_TITLES and BENCHMARK_REVIEWS (for example
+10000 titles and 1000000 reviews). BENCHMARK_ROUNDS sets the requests per endpoint,
+BENCHMARK_TOLERANCE the allowed latency and memory growth over the
+baseline (1.5 = +50%), BENCHMARK_UPDATE_BASELINE=1 stores the results
+as the new baseline of the dataset profile.
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+requires_benchmark = pytest.mark.skipif(
+    not os.getenv('BENCHMARK'), reason='set BENCHMARK=1 to run benchmarks'
+)
+
+USERS = int(os.getenv('BENCHMARK_USERS', 1000))
+TITLES = int(os.getenv('BENCHMARK_TITLES', 1000))
+REVIEWS = int(os.getenv('BENCHMARK_REVIEWS', 20000))
+ROUNDS = int(os.getenv('BENCHMARK_ROUNDS', 20))
+TOLERANCE = float(os.getenv('BENCHMARK_TOLERANCE', 1.5))
+WARM_CACHE = bool(os.getenv('BENCHMARK_WARM_CACHE'))
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+
+@pytest.fixture(scope='session')
+def benchmark_data(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        started = time.monotonic()
+        call_command(
+            'generate_dataset', users=USERS, titles=TITLES, reviews=REVIEWS,
+            stdout=StringIO(),
+        )
+        print(f'\nSeeded {TITLES} titles and {REVIEWS} reviews '
+              f'in {time.monotonic() - started:.1f} s.')
+        yield
+        call_command('flush', interactive=False)
+
+
+class Scenario:
+    """One request of the benchmark: route name, method, URL and body."""
+
+    def __init__(
+        self, route, method, url, data=None, client='user', prepare=None
+    ):
+        self.route = route
+        self.method = method
+        self.url = url
+        self.data = data
+        self.client = client
+        self.prepare = prepare
+
+    @property
+    def key(self):
+        return f'{self.route} {self.method.upper()}'
+
+    def build(self, context, number):
+        if self.prepare is not None:
+            self.prepare(context, number)
+        url = self.url.format(number=number, **context)
+        data = self.data(number) if callable(self.data) else self.data
+        return url, data
+
+
+def create_category(context, number):
+    from reviews.models import Category
+
+    Category.objects.create(name='Удаляемая', slug=f'delete-{number}')
+
+
+def create_genre(context, number):
+    from reviews.models import Genre
+
+    Genre.objects.create(name='Удаляемый', slug=f'delete-{number}')
+
+
+SCENARIOS = [
+    Scenario('api-root', 'get', '/api/v1/'),
+    Scenario('signup', 'post', '/api/v1/auth/signup/', client='anonymous',
+             data=lambda n: {'username': f'new{n}', 'email': f'new{n}@yamdb.fake'}),
+    Scenario('get_token', 'post', '/api/v1/auth/token/', client='anonymous',
+             data={'username': 'synthetic1', 'confirmation_code': 'wrong'}),
+    Scenario('categories-list', 'get', '/api/v1/categories/'),
+    Scenario('categories-detail', 'delete', '/api/v1/categories/delete-{number}/',
+             client='admin', prepare=create_category),
+    Scenario('genres-list', 'get', '/api/v1/genres/'),
+    Scenario('genres-detail', 'delete', '/api/v1/genres/delete-{number}/',
+             client='admin', prepare=create_genre),
+    Scenario('titles-list', 'get', '/api/v1/titles/'),
+    Scenario('titles-list', 'get', '/api/v1/titles/?genre=genre-1&page=3'),
+    Scenario('titles-list', 'get', '/api/v1/titles/?search=Тихий дом'),
+    Scenario('titles-list', 'get',
+             '/api/v1/titles/?genre=genre-1,genre-2&category=category-1'
+             '&year_min=1950&year_max=2000'),
+    Scenario('titles-list', 'get', '/api/v1/titles/?genre_any=genre-1,genre-2'),
+    Scenario('titles-list', 'post', '/api/v1/titles/', client='admin',
+             data=lambda n: {'name': f'Новое {n}', 'year': 2000,
+                             'category': 'category-1', 'genre': ['genre-1']}),
+    Scenario('titles-bulk', 'post', '/api/v1/titles/bulk/', client='admin',
+             data=lambda n: [{'name': f'Пакет {n} {i}', 'year': 2000,
+                              'category': 'category-1', 'genre': ['genre-1']}
+                             for i in range(10)]),
+    Scenario('titles-top', 'get', '/api/v1/titles/top/'),
+    Scenario('titles-top', 'get', '/api/v1/titles/top/?category=category-1'),
+    Scenario('titles-detail', 'get', '/api/v1/titles/{title_id}/'),
+    Scenario('titles-stats', 'get', '/api/v1/titles/{title_id}/stats/'),
+    Scenario('reviews-list', 'get', '/api/v1/titles/{title_id}/reviews/'),
+    Scenario('reviews-list', 'get',
+             '/api/v1/titles/{title_id}/reviews/?pagination=cursor'),
+    Scenario('reviews-detail', 'get',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/'),
+    Scenario('comments-list', 'get',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'),
+    Scenario('comments-list', 'post',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+             data={'text': 'Новый комментарий'}),
+    Scenario('comments-detail', 'get',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/'),
+    Scenario('users-list', 'get', '/api/v1/users/', client='admin'),
+    Scenario('users-detail', 'get', '/api/v1/users/synthetic1/', client='admin'),
+    Scenario('users-users-me', 'get', '/api/v1/users/me/'),
+    Scenario('users-users-me', 'patch', '/api/v1/users/me/',
+             data=lambda n: {'bio': f'О себе {n}'}),
+]
+
+
+def route_names():
+    from api.v1.urls import auth_urlpatterns, router_v1
+
+    return {url.name for url in router_v1.urls} | {
+        url.name for url in auth_urlpatterns
+    }
+
+
+def make_clients():
+    from users.models import User
+
+    admin = User.objects.create_user(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    user = User.objects.get(username='synthetic1')
+    clients = {'anonymous': APIClient()}
+    for name, owner in (('admin', admin), ('user', user)):
+        clients[name] = APIClient()
+        clients[name].credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(owner)}'
+        )
+    return clients
+
+
+def make_context():
+    from reviews.models import Comment
+
+    comment = Comment.objects.select_related('review').earliest('id')
+    return {
+        'title_id': comment.review.title_id,
+        'review_id': comment.review_id,
+        'comment_id': comment.id,
+    }
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+def run_scenario(scenario, clients, context):
+    client = clients[scenario.client]
+    latencies, statuses = [], set()
+    for number in range(ROUNDS):
+        url, data = scenario.build(context, number)
+        if not WARM_CACHE:
+            cache.clear()
+        started = time.perf_counter()
+        response = getattr(client, scenario.method)(
+            url, data=data, format='json'
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+    url, data = scenario.build(context, ROUNDS)
+    if not WARM_CACHE:
+        cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        getattr(client, scenario.method)(url, data=data, format='json')
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1),
+        'statuses': sorted(statuses),
+    }
+
+
+def regressions(key, result, baseline):
+    found = []
+    if result['statuses'] != baseline['statuses']:
+        found.append(
+            f"{key}: statuses {result['statuses']}, "
+            f"baseline {baseline['statuses']}"
+        )
+    if result['queries'] > baseline['queries']:
+        found.append(
+            f"{key}: {result['queries']} queries, baseline {baseline['queries']}"
+        )
+    for metric in ('p95_ms', 'peak_kb'):
+        if result[metric] > baseline[metric] * TOLERANCE:
+            found.append(
+                f'{key}: {metric} {result[metric]}, baseline '
+                f'{baseline[metric]} (tolerance x{TOLERANCE})'
+            )
+    return found
+
+
+@pytest.mark.django_db
+class TestEndpointBenchmarks:
+
+    def test_every_route_is_benchmarked(self):
+        assert route_names() <= {scenario.route for scenario in SCENARIOS}, (
+            'Add a benchmark scenario for the new api/v1 route'
+        )
+
+    @requires_benchmark
+    def test_endpoints_against_baseline(self, benchmark_data):
+        profile = f'{connection.vendor}-{TITLES}-titles-{REVIEWS}-reviews'
+        clients = make_clients()
+        context = make_context()
+        results = {}
+        for scenario in SCENARIOS:
+            key = f'{scenario.key} {scenario.url}'
+            results[key] = run_scenario(scenario, clients, context)
+        width = max(map(len, results))
+        print(f'\nProfile {profile}, {ROUNDS} rounds')
+        print(f"{'endpoint':<{width}}   p50 ms   p95 ms  queries  peak KB")
+        for key, result in results.items():
+            print(
+                f"{key:<{width}} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                f"{result['queries']:>8} {result['peak_kb']:>8}"
+            )
+
+        baselines = json.loads(BASELINE_PATH.read_text(encoding='utf-8'))
+        if os.getenv('BENCHMARK_UPDATE_BASELINE'):
+            baselines[profile] = results
+            BASELINE_PATH.write_text(
+                json.dumps(baselines, indent=2, ensure_ascii=False) + '\n',
+                encoding='utf-8',
+            )
+            return
+        if profile not in baselines:
+            pytest.skip(
+                f'No baseline for {profile}, '
+                'run with BENCHMARK_UPDATE_BASELINE=1'
+            )
+        found = []
+        for key, result in results.items():
+            if key not in baselines[profile]:
+                found.append(f'{key}: no baseline')
+                continue
+            found.extend(regressions(key, result, baselines[profile][key]))
+        assert not found, 'Endpoint regressions:\n' + '\n'.join(found)
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+
+import pytest
+
+
+@pytest.fixture
+def query_budget():
+    """Assert the block runs at most 'max_queries' statements.
+
+    Statements of one shape repeated more than 'repeated' times fail the
+    block too, whatever the total is:
+
+        with query_budget(5):
+            client.get('/api/v1/titles/')
+    """
+    from api.queries import QueryRecorder
+
+    @contextmanager
+    def budget(max_queries, repeated=2):
+        with QueryRecorder() as recorder:
+            yield recorder
+        problems = []
+        if recorder.count > max_queries:
+            problems.append(
+                f'{recorder.count} queries, the budget is {max_queries}'
+            )
+        problems.extend(
+            f'statement executed {number} times: {shape}'
+            for shape, number in recorder.repeated(repeated)
+        )
+        assert not problems, '\n'.join(
+            problems + ['Queries:'] + [query.sql for query in recorder.queries]
+        )
+
+    return budget
@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.migrations.writer import MigrationWriter
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestAdviseIndexes:
+
+    def test_probes_and_written_migration(self, tmp_path, monkeypatch,
+                                          user, category, title):
+        for year in (2000, 2001):
+            Title.objects.create(name='Год', year=year, category=category)
+        Review.objects.create(title=title, author=user, text='Да', score=5)
+        monkeypatch.setattr(
+            MigrationWriter, 'basedir', property(lambda writer: str(tmp_path))
+        )
+        out = StringIO()
+
+        call_command('advise_indexes', '--min-rows', '0', '--write', stdout=out)
+
+        output = out.getvalue()
+        assert 'reviews {"pagination": "cursor"}: ok' in output
+        assert (
+            'titles {"year": "2000"}: suggest reviews_title '
+            "['year', 'name']" in output
+        )
+        source, = (
+            migration.read_text()
+            for migration in tmp_path.glob('*_advised_indexes.py')
+            if "('reviews', " in migration.read_text()
+        )
+        assert "('reviews', '0008_title_rank')" in source
+        assert "fields=['year', 'name']" in source
+
+    def test_small_tables_are_skipped(self, category, title):
+        out = StringIO()
+        call_command('advise_indexes', stdout=out)
+        assert 'suggest' not in out.getvalue()
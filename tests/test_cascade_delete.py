@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title, TitleRank, TitleStats
+
+
+def add_reviews(title, authors, comments=2):
+    for author in authors:
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=7
+        )
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий')
+            for _ in range(comments)
+        )
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(10)
+    ]
+
+
+def queries_of(request):
+    with CaptureQueriesContext(connection) as context:
+        response = request()
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCascadeDelete:
+
+    def test_title_delete_does_not_load_reviews(self, admin_client, title,
+                                                category, genres, authors):
+        add_reviews(title, authors[:1])
+        other = Title.objects.create(name='Смех', year=2000, category=category)
+        other.genre.set(genres)
+        add_reviews(other, authors)
+        admin_client.get('/api/v1/titles/')
+        queries = []
+        for deleted in (title, other):
+            response, number = queries_of(
+                lambda: admin_client.delete(f'/api/v1/titles/{deleted.id}/')
+            )
+            assert response.status_code == 204
+            queries.append(number)
+        assert queries[0] == queries[1]
+        for model in (Title, Review, Comment, TitleStats, TitleRank):
+            assert not model.objects.exists()
+
+    def test_review_delete_does_not_load_comments(self, user_client, user,
+                                                  title, category, authors):
+        other = Title.objects.create(name='Смех', year=2000, category=category)
+        add_reviews(title, authors[:2], comments=1)
+        add_reviews(other, [authors[2], user], comments=1)
+        add_reviews(title, [user], comments=20)
+        user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        queries = []
+        for review in Review.objects.filter(author=user).order_by('pk'):
+            response, number = queries_of(
+                lambda: user_client.delete(
+                    f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+                )
+            )
+            assert response.status_code == 204
+            queries.append(number)
+        assert queries[0] == queries[1]
+        assert Comment.objects.count() == 3
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (14, 2)
+
+    def test_comments_of_a_deleted_title_are_not_fresh(self, admin_client,
+                                                       user_client, title,
+                                                       authors):
+        add_reviews(title, authors[:1])
+        review = Review.objects.get()
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+    def test_admin_counts_the_cascade(self, django_user_model, title,
+                                      authors):
+        add_reviews(title, authors[:3])
+        client = Client()
+        client.force_login(django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        ))
+        url = f'/admin/reviews/title/{title.id}/delete/'
+        response = client.get(url)
+        assert response.status_code == 200
+        assert dict(response.context['model_count']) == {
+            'titles': 1, 'reviews': 3, 'comments': 6,
+        }
+        response = client.post(url, {'post': 'yes'})
+        assert response.status_code == 302
+        assert not Comment.objects.exists()
@@ -0,0 +1,81 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    ])
+    def test_fresh_copy_is_not_modified(self, url, title, django_assert_num_queries):
+        client = APIClient()
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert response.content == b''
+
+    def test_review_write_changes_etag(self, user, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        user_client.post(url, data={'text': 'Текст', 'score': 7})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_comments_and_query_string(self, user, user_client, title):
+        review = Review.objects.create(title=title, author=user, text='Текст', score=5)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(url + '?page=1')['ETag'] != etag
+        user_client.post(url, data={'text': 'Комментарий'})
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_if_modified_since(self, title):
+        client = APIClient()
+        response = client.get('/api/v1/titles/')
+        response = client.get(
+            '/api/v1/titles/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_categories_have_no_detail_read(self, category):
+        assert APIClient().get(f'/api/v1/categories/{category.slug}/').status_code == 405
+
+    def test_only_renaming_changes_review_etags(self, user, user_client,
+                                                admin_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = user_client.get(url)['ETag']
+        user_client.patch('/api/v1/users/me/', data={'bio': 'Новое'})
+        admin_client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake',
+        })
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        user_client.patch('/api/v1/users/me/', data={'username': 'Renamed'})
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_any_etag_needs_an_existing_resource(self, title):
+        client = APIClient()
+        response = client.get(
+            f'/api/v1/titles/{title.id}/', HTTP_IF_NONE_MATCH='*'
+        )
+        assert response.status_code == 304
+        assert response.content == b''
+        response = client.get(
+            f'/api/v1/titles/{title.id + 1}/', HTTP_IF_NONE_MATCH='*'
+        )
+        assert response.status_code == 404
+        response = client.get(
+            f'/api/v1/titles/{title.id + 1}/reviews/', HTTP_IF_NONE_MATCH='*'
+        )
+        assert response.status_code == 404
@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+
+from api_yamdb import pool as pool_module
+from api_yamdb.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(pool_module, 'time', clock)
+    return clock
+
+
+def make_pool(**options):
+    def close(connection):
+        connection.closed = True
+
+    def check(connection, ping):
+        checks.append(ping)
+        return not connection.closed and (not ping or connection.alive)
+
+    checks = []
+    pool = ConnectionPool(FakeConnection, close, check, **options)
+    pool.checks = checks
+    return pool
+
+
+class TestConnectionPool:
+
+    def test_released_connection_is_reused(self, clock):
+        pool = make_pool(size=2)
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        second = pool.acquire()
+        assert second is not first
+        stats = pool.stats()
+        assert stats['opened'] == 2
+        assert stats['in_use'] == 2
+        assert stats['checkouts'] == 3
+
+    def test_checkout_waits_for_a_release(self):
+        pool = make_pool(size=1, timeout=5)
+        first = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, (first,))
+        timer.start()
+        assert pool.acquire() is first
+        timer.join()
+        assert pool.stats()['wait_seconds_max'] > 0
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = make_pool(size=1, timeout=0.01)
+        pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        assert pool.stats()['timeouts'] == 1
+        assert pool.stats()['open'] == 1
+
+    def test_old_and_idle_connections_are_evicted(self, clock):
+        pool = make_pool(size=2, max_lifetime=100, max_idle=10)
+        old = pool.acquire()
+        idle = pool.acquire()
+        pool.release(idle)
+        clock.now += 11
+        pool.release(old)
+        assert pool.acquire() is old
+        clock.now += 90
+        pool.release(old)
+        fresh = pool.acquire()
+        assert fresh is not old and fresh is not idle
+        assert old.closed and idle.closed
+        assert pool.stats()['closed'] == {
+            'lifetime': 1, 'idle': 1, 'broken': 0, 'shutdown': 0,
+        }
+
+    def test_broken_connection_is_replaced_on_checkout(self, clock):
+        pool = make_pool(size=1, check_after=5)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.alive = False
+        assert pool.acquire() is connection
+        pool.release(connection)
+        clock.now += 5
+        replacement = pool.acquire()
+        assert replacement is not connection
+        assert pool.checks == [False, True]
+        assert pool.stats()['closed']['broken'] == 1
+
+    def test_unusable_connection_is_not_pooled(self, clock):
+        pool = make_pool(size=1)
+        connection = pool.acquire()
+        pool.release(connection, reusable=False)
+        assert connection.closed
+        assert pool.stats()['open'] == 0
+
+    def test_foreign_connection_is_left_alone(self):
+        pool = make_pool()
+        connection = FakeConnection()
+        pool.release(connection)
+        assert not connection.closed
+        assert pool.stats()['idle'] == 0
+
+
+class TestPoolMetrics:
+
+    @pytest.fixture
+    def pools(self, monkeypatch):
+        pools = {('default', 'yamdb'): make_pool(size=3)}
+        monkeypatch.setattr(pool_module, 'pools', pools)
+        return pools
+
+    def test_metrics(self, pools, client):
+        pools['default', 'yamdb'].acquire()
+        response = client.get('/metrics/db-pool/')
+        assert response.status_code == 200
+        lines = response.content.decode().splitlines()
+        assert any(
+            line.startswith('db_pool_in_use{alias="default",database="yamdb"')
+            and line.endswith(' 1')
+            for line in lines
+        )
+        assert any(
+            'db_pool_closed{' in line and 'reason="idle"' in line
+            for line in lines
+        )
+
+    def test_metrics_are_internal(self, pools, client):
+        response = client.get('/metrics/db-pool/', REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == 404
@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Comment, Review, Title, TitleStats
+from users.models import User
+
+
+def generate(*args):
+    call_command(
+        'generate_dataset', '--users', '20', '--titles', '30',
+        '--reviews', '300', '--genres', '5', '--categories', '3',
+        *args, stdout=StringIO(),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateDataset:
+
+    def test_generated_rows_are_consistent(self, user):
+        generate('--zipf', '1.2', '--comments-per-review', '1')
+
+        assert Title.objects.count() == 30
+        assert Review.objects.count() == 300
+        assert User.objects.filter(username__startswith='synthetic').count() == 20
+        assert not Review.objects.values('title', 'author').annotate(
+            number=Count('id')
+        ).filter(number__gt=1).exists()
+        assert not Title.objects.with_rating_drift().exists()
+        generated = {
+            stats.title_id: stats.histogram
+            for stats in TitleStats.objects.all()
+        }
+        assert len(generated) == 30
+        TitleStats.objects.rebuild(list(generated))
+        assert generated == {
+            stats.title_id: stats.histogram
+            for stats in TitleStats.objects.all()
+        }
+        assert Comment.objects.exists()
+        for title in Title.objects.prefetch_related('genre'):
+            assert title.genre_ids
+            assert title.genre_ids == sorted(g.pk for g in title.genre.all())
+        counts = sorted(Title.objects.values_list('rating_count', flat=True))
+        assert counts[-1] == 20
+        assert counts[len(counts) // 2] < 10
+
+    def test_generation_appends_or_clears(self):
+        generate()
+        generate()
+        assert Title.objects.count() == 60
+
+        generate('--clear')
+        assert Title.objects.count() == 30
+        assert User.objects.count() == 20
+
+    def test_too_many_reviews_are_rejected(self):
+        with pytest.raises(Exception, match='do not fit'):
+            generate('--reviews', '601')
@@ -0,0 +1,38 @@
+import pytest
+from django.core.management import call_command
+
+from api_yamdb import settings
+from reviews.models import Genre, Title, TitleRank
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportTestData:
+
+    def test_import_in_dependency_order(self, tmp_path, monkeypatch, user):
+        files = {
+            'reviews_title_genre.csv': 'id;title_id;genre_id\n1;1;1\n2;1;2\n',
+            'reviews_review.csv': (
+                'id;title_id;text;author_id;score;pub_date\n'
+                f'1;1;Отлично;{user.id};9;2022-01-01 00:00:00\n'
+            ),
+            'reviews_title.csv': (
+                'id;name;year;category_id;description\n1;Чудо;2018;1;\n'
+            ),
+            'reviews_genre.csv': 'id;name;slug\n1;Драма;drama\n2;Комедия;comedy\n',
+            'reviews_category.csv': 'id;name;slug\n1;Фильм;films\n',
+            'readme.txt': 'not a table',
+        }
+        for filename, content in files.items():
+            (tmp_path / filename).write_text(content, encoding='utf8')
+        monkeypatch.setattr(settings, 'STATICFILES_DIRS_DATA', str(tmp_path), raising=False)
+
+        call_command('import_test_data', '--chunk-size', '1')
+        # The tables and everything derived from them are replaced.
+        call_command('import_test_data', '--chunk-size', '1')
+
+        title = Title.objects.get()
+        assert list(title.genre.order_by('id').values_list('slug', flat=True)) == ['drama', 'comedy']
+        assert (title.rating_sum, title.rating_count) == (9, 1)
+        assert title.genre_ids == [1, 2]
+        assert Genre.objects.count() == 2
+        assert TitleRank.objects.get().rating_count == 1
@@ -0,0 +1,89 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from users.models import EmailOutbox
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def signup(self):
+        return APIClient().post(
+            '/api/v1/auth/signup/',
+            data={'username': 'new_user', 'email': 'new_user@yamdb.fake'},
+        )
+
+    def test_signup_queues_email(self):
+        response = self.signup()
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0
+        outgoing = EmailOutbox.objects.get()
+        assert outgoing.recipient == 'new_user@yamdb.fake'
+
+    def test_worker_sends_queued_emails(self):
+        self.signup()
+        call_command('send_outbox_emails', '--once')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new_user@yamdb.fake']
+        assert EmailOutbox.objects.get().sent_at is not None
+        call_command('send_outbox_emails', '--once')
+        assert len(mail.outbox) == 1
+
+    def test_worker_retries_with_backoff(self, monkeypatch):
+        self.signup()
+
+        def fail(*args, **kwargs):
+            raise ConnectionError('relay is down')
+
+        monkeypatch.setattr(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', fail
+        )
+        call_command('send_outbox_emails', '--once', '--max-attempts', '2')
+        outgoing = EmailOutbox.objects.get()
+        assert outgoing.attempts == 1
+        assert outgoing.sent_at is None
+        assert 'relay is down' in outgoing.last_error
+        assert not EmailOutbox.objects.pending().exists()
+
+    def test_worker_survives_a_refused_connection(self, monkeypatch):
+        self.signup()
+
+        def refuse(*args, **kwargs):
+            raise ConnectionRefusedError('relay is down')
+
+        monkeypatch.setattr(
+            'django.core.mail.backends.locmem.EmailBackend.open', refuse
+        )
+        call_command('send_outbox_emails', '--once')
+        outgoing = EmailOutbox.objects.get()
+        assert outgoing.attempts == 1
+        assert 'relay is down' in outgoing.last_error
+        assert outgoing.next_attempt_at is not None
+        assert len(mail.outbox) == 0
+
+    def test_failed_send_reconnects(self, monkeypatch):
+        self.signup()
+        APIClient().post(
+            '/api/v1/auth/signup/',
+            data={'username': 'other_user', 'email': 'other@yamdb.fake'},
+        )
+        events = []
+        send = EmailBackend.send_messages
+
+        def drop_once(backend, messages):
+            events.append('send')
+            if events.count('send') == 1:
+                raise ConnectionResetError('session dropped')
+            return send(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', drop_once)
+        monkeypatch.setattr(
+            EmailBackend, 'close', lambda backend: events.append('close')
+        )
+        call_command('send_outbox_emails', '--once')
+        assert events[:3] == ['send', 'close', 'send']
+        assert len(mail.outbox) == 1
+        assert EmailOutbox.objects.filter(attempts=1).count() == 1
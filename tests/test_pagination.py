@@ -0,0 +1,32 @@
+import pytest
+
+from reviews.models import Comment, Review
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_cursor_pages_cover_all_comments(self, user, user_client, title):
+        review = Review.objects.create(title=title, author=user, text='Текст', score=5)
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {i}')
+            for i in range(10)
+        )
+        url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?pagination=cursor'
+        )
+        seen = []
+        while url:
+            response = user_client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            seen.extend(comment['id'] for comment in response.data['results'])
+            url = response.data['next']
+
+        assert seen == list(review.comments.values_list('id', flat=True))
+
+    def test_page_number_is_default(self, user, user_client, title):
+        Review.objects.create(title=title, author=user, text='Текст', score=5)
+        response = user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.data['count'] == 1
@@ -0,0 +1,135 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from api.queries import fingerprint
+from reviews import references
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def catalogue(django_user_model, category, genres, title):
+    for number in range(5):
+        extra = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        extra.genre.set(genres)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(4)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, text='Текст', score=5
+        )
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(review=reviews[0], author=author, text='Да')
+    # Loaded once per process and reloaded only after changes.
+    references.load()
+    return title, reviews[0]
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+
+    @pytest.mark.parametrize('url, budget', [
+        ('/api/v1/titles/', 3),
+        ('/api/v1/titles/{title}/', 2),
+        ('/api/v1/categories/', 3),
+        ('/api/v1/genres/', 3),
+        ('/api/v1/titles/{title}/reviews/', 4),
+        ('/api/v1/titles/{title}/reviews/{review}/comments/', 4),
+    ])
+    def test_read_endpoints(self, user_client, catalogue, query_budget,
+                            url, budget):
+        title, review = catalogue
+        with query_budget(budget):
+            response = user_client.get(
+                url.format(title=title.id, review=review.id)
+            )
+        assert response.status_code == 200
+
+    def test_review_create(self, user_client, catalogue, query_budget):
+        title, _ = catalogue
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.get('/api/v1/users/me/')
+        # Rating and histogram, then the insert, no reads ahead of them;
+        # the rank follows after the commit. One statement less on
+        # PostgreSQL, where the histogram joins the rating update.
+        with query_budget(5):
+            response = user_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == 201
+        # Rolled back by the constraint, told apart by its name.
+        with query_budget(6):
+            response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': [
+                'You can only leave one review for this creation.'
+            ]
+        }
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (27, 5)
+
+    def test_review_create_of_missing_title(self, user_client, catalogue,
+                                            query_budget):
+        user_client.get('/api/v1/users/me/')
+        with query_budget(4):
+            response = user_client.post(
+                '/api/v1/titles/0/reviews/', data={'text': 'Да', 'score': 7}
+            )
+        assert response.status_code == 404
+
+    def test_repeated_statements_fail_the_budget(self, catalogue, query_budget):
+        with pytest.raises(AssertionError, match='executed 6 times'):
+            with query_budget(100):
+                for title in Title.objects.all():
+                    list(title.genre.all())
+
+
+class TestFingerprint:
+
+    def test_literals_and_in_lists_are_collapsed(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s,  %s) AND c = 10"
+        ) == 'SELECT * FROM t WHERE a = ? AND b IN (...) AND c = ?'
+
+
+@pytest.mark.django_db
+class TestQueryInstrumentationMiddleware:
+
+    def test_headers_and_repeated_statements_are_reported(
+        self, settings, user_client, catalogue, caplog, monkeypatch
+    ):
+        from api.v1 import views
+
+        title, _ = catalogue
+        settings.SQL_REPEATED_QUERY_THRESHOLD = 3
+        monkeypatch.setattr(
+            views.ReviewViewSet,
+            'get_queryset',
+            lambda view: view.get_title_obj().reviews.all(),
+        )
+        middleware = ['api.middleware.QueryInstrumentationMiddleware']
+        with override_settings(MIDDLEWARE=middleware + settings.MIDDLEWARE):
+            with caplog.at_level(logging.INFO, logger='api.sql'):
+                response = user_client.get(
+                    f'/api/v1/titles/{title.id}/reviews/'
+                )
+
+        assert int(response['X-DB-Query-Count']) > 4
+        assert float(response['X-DB-Time-Ms']) >= 0
+        # The authenticated user is read by the same statement.
+        assert 'count=5' in response['X-DB-Repeated-Queries']
+        warning = next(
+            record for record in caplog.records
+            if record.levelno == logging.WARNING
+        )
+        assert warning.sql['view'] == 'api:reviews-list'
+        assert warning.sql['count'] == 5
+        assert 'users_user' in warning.sql['statement']
@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+
+from reviews.models import Category, Review, Title, TitleStats
+
+
+@pytest.mark.django_db
+class TestRatingAggregates:
+
+    def test_review_create_update_delete(self, user_client, another_user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Хорошо', 'score': 8})
+        assert response.status_code == 201, response.data
+        another_user_client.post(url, data={'text': 'Плохо', 'score': 3})
+        review_id = response.data['id']
+
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (11, 2)
+        assert user_client.get(f'/api/v1/titles/{title.id}/').data['rating'] == 5
+
+        user_client.patch(f'{url}{review_id}/', data={'score': 10})
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (13, 2)
+
+        user_client.delete(f'{url}{review_id}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (3, 1)
+
+    def test_histogram_of_a_first_review(self, user, title):
+        TitleStats.objects.filter(title=title).delete()
+        Review.objects.create(title=title, author=user, text='Да', score=4)
+        assert TitleStats.objects.get(title=title).histogram[4] == 1
+
+    def test_duplicate_is_told_by_the_constraint(self, user, title):
+        Review.objects.create(title=title, author=user, text='Да', score=4)
+        with pytest.raises(IntegrityError) as duplicate, transaction.atomic():
+            Review.objects.create(title=title, author=user, text='Ещё', score=5)
+        assert Review.is_duplicate(duplicate.value)
+        with pytest.raises(IntegrityError) as other, transaction.atomic():
+            Category.objects.create(name='Фильм', slug='films')
+        assert not Review.is_duplicate(other.value)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (4, 1)
+
+    def test_stale_title_save_keeps_the_rating(self, user, title, genres):
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=user, text='Да', score=9)
+        title.genre.set(genres[:1])
+        stale.name = 'Новое чудо'
+        stale.save()
+        title.refresh_from_db()
+        assert title.name == 'Новое чудо'
+        assert (title.rating_sum, title.rating_count) == (9, 1)
+        assert title.genre_ids == [genres[0].pk]
+
+    def test_title_without_reviews_has_no_rating(self, user_client, title):
+        response = user_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.data['rating'] is None
+
+    def test_reconcile_ratings(self, user, title):
+        Review.objects.create(title=title, author=user, text='Текст', score=7)
+        Title.objects.filter(pk=title.pk).update(rating_sum=100, rating_count=9)
+
+        assert Title.objects.with_rating_drift().count() == 1
+        call_command('reconcile_ratings')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1)
+        assert not Title.objects.with_rating_drift().exists()
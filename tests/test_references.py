@@ -0,0 +1,80 @@
+import pytest
+
+from reviews import references
+from reviews.models import Genre
+from reviews.references import ReferenceCache
+from reviews.versions import GENRES, get_version
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReferenceCache:
+
+    def test_change_reaches_other_workers(self, genres):
+        drama, _ = genres
+        worker = ReferenceCache(Genre, GENRES)
+        worker.refresh(get_version(GENRES))
+        assert worker.get(drama.pk).name == 'Драма'
+        drama.name = 'Трагедия'
+        drama.save()
+        assert worker.get(drama.pk).name == 'Драма'
+        worker.refresh(get_version(GENRES))
+        assert worker.get(drama.pk).name == 'Трагедия'
+
+    def test_unknown_key_reloads_the_copy(self, genres):
+        references.load()
+        horror = Genre.objects.create(name='Ужасы', slug='horror')
+        assert references.genres.by_slug('horror') == horror
+        assert references.genres.ids({'horror', 'unknown'}) == {
+            'horror': horror.pk
+        }
+        assert [genre.slug for genre in references.genres.ordered(
+            [horror.pk, *(genre.pk for genre in genres)]
+        )] == ['drama', 'comedy', 'horror']
+
+    def test_unknown_slugs_are_remembered(self, genres,
+                                          django_assert_num_queries):
+        references.load()
+        with django_assert_num_queries(0):
+            assert references.genres.ids({'typo'}) == {}
+            assert references.genres.by_slug('typo') is None
+        horror = Genre.objects.create(name='Ужасы', slug='typo')
+        references.refresh()
+        assert references.genres.by_slug('typo') == horror
+
+    def test_stale_copy_loads_on_use(self, title, genres,
+                                     django_assert_num_queries):
+        references.load()
+        genres[0].save()
+        references.refresh()
+        with django_assert_num_queries(1):
+            references.genres.by_slug('drama')
+            references.genres.by_slug('comedy')
+
+    def test_titles_without_reference_queries(self, title, client,
+                                              django_assert_num_queries):
+        references.load()
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/')
+        assert response.data['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+        assert response.data['results'][0]['category'] == {
+            'name': 'Фильм', 'slug': 'films'
+        }
+
+    def test_title_written_with_new_and_unknown_slugs(self, admin_client,
+                                                      category, genres):
+        references.load()
+        Genre.objects.create(name='Ужасы', slug='horror')
+        data = {'name': 'Страх', 'year': 2010, 'category': 'films'}
+        response = admin_client.post(
+            '/api/v1/titles/', data={**data, 'genre': ['horror', 'drama']}
+        )
+        assert response.status_code == 201, response.data
+        assert sorted(response.data['genre']) == ['drama', 'horror']
+        response = admin_client.post(
+            '/api/v1/titles/', data={**data, 'genre': ['unknown']}
+        )
+        assert response.status_code == 400
+        assert 'genre' in response.data
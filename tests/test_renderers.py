@@ -0,0 +1,110 @@
+import datetime
+import gzip
+import json
+from collections import OrderedDict
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.renderers import ORJSONRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+requires_msgpack = pytest.mark.skipif(
+    msgpack is None, reason='msgpack is not installed'
+)
+
+
+class TestORJSONRenderer:
+
+    @pytest.mark.parametrize('data', [
+        [OrderedDict(id=1, name='Чудо', rating=None, genre=[])],
+        {'text': 'строка и абзац "в кавычках"', 'score': 7.5},
+        {'pub_date': datetime.datetime(
+            2021, 5, 1, 10, 30, 15, 120000, tzinfo=datetime.timezone.utc
+        ), 'day': datetime.date(2021, 5, 1)},
+        {'histogram': {1: 0, 10: 3}, 'mean': Decimal('7.25')},
+        [],
+    ])
+    def test_same_bytes_as_json_renderer(self, data):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indented_output_is_left_to_json_renderer(self):
+        data = {'name': 'Чудо'}
+        media_type = 'application/json; indent=4'
+        assert ORJSONRenderer().render(data, media_type) == (
+            JSONRenderer().render(data, media_type)
+        )
+
+
+@requires_msgpack
+@pytest.mark.django_db(transaction=True)
+class TestContentNegotiation:
+
+    def test_titles_in_message_pack(self, title):
+        client = APIClient()
+        json_data = client.get('/api/v1/titles/').json()
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/msgpack'
+        )
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content) == json_data
+
+    def test_review_sent_in_message_pack(self, user_client, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data=msgpack.packb({'text': 'Хорошо', 'score': 8}),
+            content_type='application/msgpack',
+        )
+        assert response.status_code == 201, response.data
+        assert response.data['score'] == 8
+
+    @pytest.mark.parametrize('content_type, body', [
+        ('application/json', b'{"text": '),
+        ('application/msgpack', b'\xc1'),
+    ])
+    def test_malformed_body(self, user_client, title, content_type, body):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data=body,
+            content_type=content_type,
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCompression:
+
+    @pytest.mark.parametrize('min_size, compressed', [(1, True), (10 ** 6, False)])
+    def test_compressed_above_threshold(self, settings, title, min_size,
+                                        compressed):
+        settings.RESPONSE_COMPRESSION_MIN_SIZE = min_size
+        response = APIClient().get(
+            '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response.status_code == 200
+        assert (response.get('Content-Encoding') == 'gzip') is compressed
+        content = response.content
+        if compressed:
+            content = gzip.decompress(content)
+        assert json.loads(content)['results'][0]['name'] == title.name
+
+    def test_compressed_copy_is_not_modified(self, settings, title):
+        settings.RESPONSE_COMPRESSION_MIN_SIZE = 1
+        client = APIClient()
+        etag = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')[
+            'ETag'
+        ]
+        assert etag.startswith('W/')
+        response = client.get(
+            '/api/v1/titles/',
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == 304
@@ -0,0 +1,136 @@
+import sqlite3
+
+import pytest
+from django.db import connection, connections
+from rest_framework.test import APIClient
+
+from api_yamdb.routers import RequestRouting, ReplicaRouter, health, routing
+from reviews import references
+from reviews.models import Genre, Review, Title, TitleStats
+from users.snapshots import get_user_snapshot
+
+REPLICA = 'replica_1'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Second SQLite database, 'snapshot' copies the primary into it."""
+    if connection.vendor != 'sqlite':
+        pytest.skip('Replicas are emulated with SQLite files')
+    path = tmp_path / 'replica.sqlite3'
+
+    def snapshot():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        connections[REPLICA].close()
+
+    connections.databases[REPLICA] = dict(
+        connections.databases['default'], NAME=str(path)
+    )
+    settings.DB_REPLICAS = [REPLICA]
+    health.reset()
+    yield snapshot
+    connections[REPLICA].close()
+    del connections.databases[REPLICA]
+    if hasattr(connections._connections, REPLICA):
+        delattr(connections._connections, REPLICA)
+    health.reset()
+
+
+def review_count(client, title):
+    response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+    assert response.status_code == 200
+    return response.data['count']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    def test_writer_reads_own_write(self, replica, user_client,
+                                    another_user_client, title):
+        replica()
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Хорошо', 'score': 8},
+        )
+        assert response.status_code == 201
+
+        assert review_count(another_user_client, title) == 0
+        assert review_count(user_client, title) == 1
+        user_client.cookies.clear()
+        assert review_count(user_client, title) == 1
+
+    def test_pin_expires(self, replica, settings, user_client, title):
+        settings.DB_PIN_SECONDS = 0
+        replica()
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Хорошо', 'score': 8},
+        )
+        user_client.cookies.clear()
+        assert review_count(user_client, title) == 0
+
+    @pytest.mark.parametrize('broken', ['lag', 'unavailable'])
+    def test_unhealthy_replica_is_skipped(self, replica, settings, broken,
+                                          user_client, another_user_client,
+                                          title):
+        replica()
+        if broken == 'lag':
+            settings.DB_REPLICA_MAX_LAG = -1
+        else:
+            connections.databases[REPLICA]['NAME'] = '/nonexistent/replica'
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Хорошо', 'score': 8},
+        )
+        assert review_count(another_user_client, title) == 1
+
+    def test_reads_follow_writes_of_the_request(self, replica):
+        router = ReplicaRouter()
+        token = routing.set(RequestRouting(use_replica=True))
+        try:
+            assert router.db_for_read(Title) == REPLICA
+            assert router.db_for_write(Title) == 'default'
+            assert router.db_for_read(Title) == 'default'
+        finally:
+            routing.reset(token)
+        assert router.db_for_read(Title) == 'default'
+
+    def test_cached_response_is_built_from_primary(self, replica, title,
+                                                   category):
+        replica()
+        Title.objects.create(name='Новое', year=2020, category=category)
+        client = APIClient()
+        for _ in range(2):
+            response = client.get('/api/v1/titles/')
+            assert response.status_code == 200
+            assert response.data['count'] == 2
+
+    def test_cached_user_is_read_from_primary(self, replica, user,
+                                              user_client):
+        replica()
+        user.role = 'moderator'
+        user.save()
+        assert user_client.get('/api/v1/titles/').status_code == 200
+        assert get_user_snapshot(user.pk).role == 'moderator'
+
+    def test_stats_are_rebuilt_from_primary(self, replica, user, title):
+        replica()
+        Review.objects.create(title=title, author=user, text='Да', score=5)
+        TitleStats.objects.all().delete()
+        response = APIClient().get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        assert response.data['count'] == 1
+        assert TitleStats.objects.get(title=title).score_5 == 1
+
+    def test_references_are_loaded_from_primary(self, replica, genres):
+        replica()
+        Genre.objects.create(name='Ужасы', slug='horror')
+        token = routing.set(RequestRouting(use_replica=True))
+        try:
+            references.refresh()
+            assert references.genres.by_slug('horror') is not None
+        finally:
+            routing.reset(token)
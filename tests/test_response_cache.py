@@ -0,0 +1,58 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleResponseCache:
+
+    def test_cached_read_skips_database(self, title, django_assert_num_queries):
+        client = APIClient()
+        url = '/api/v1/titles/'
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.status_code == 200
+        assert second.data == first.data
+
+    @pytest.mark.parametrize('url', ['/api/v1/titles/', '/api/v1/titles/top/'])
+    def test_cached_read_is_one_cache_lookup(self, title, url, monkeypatch):
+        client = APIClient()
+        client.get(url)
+        reads, depth = [], []
+
+        def counted(read):
+            # LocMemCache.get_many reads every key with 'get'.
+            def wrapper(*args, **kwargs):
+                if not depth:
+                    reads.append(args)
+                depth.append(1)
+                try:
+                    return read(*args, **kwargs)
+                finally:
+                    depth.pop()
+            return wrapper
+
+        for method in ('get', 'get_many'):
+            monkeypatch.setattr(cache, method, counted(getattr(cache, method)))
+        assert client.get(url).status_code == 200
+        assert len(reads) == 1, reads
+
+    def test_query_string_is_part_of_key(self, title):
+        client = APIClient()
+        assert client.get('/api/v1/titles/').data['count'] == 1
+        assert client.get('/api/v1/titles/?year=1900').data['count'] == 0
+
+    def test_review_write_invalidates_rating(self, title, user_client):
+        url = f'/api/v1/titles/{title.id}/'
+        assert user_client.get(url).data['rating'] is None
+        user_client.post(f'{url}reviews/', data={'text': 'Текст', 'score': 9})
+        assert user_client.get(url).data['rating'] == 9
+
+    def test_genre_write_invalidates_titles(self, title, admin_client):
+        url = f'/api/v1/titles/{title.id}/'
+        assert len(admin_client.get(url).data['genre']) == 2
+        admin_client.post('/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'})
+        title.genre.add(title.genre.model.objects.get(slug='horror'))
+        response = admin_client.get(url)
+        assert 'horror' in [genre['slug'] for genre in response.data['genre']]
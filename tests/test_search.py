@@ -0,0 +1,43 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self, category):
+        return [
+            Title.objects.create(
+                name='Побег из Шоушенка', year=1994, category=category,
+                description='Тюремная драма'
+            ),
+            Title.objects.create(
+                name='Шоу Трумана', year=1998, category=category
+            ),
+            Title.objects.create(
+                name='Крёстный отец', year=1972, category=category
+            ),
+        ]
+
+    def search(self, query):
+        response = APIClient().get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [title['name'] for title in response.data['results']]
+
+    def test_search_by_name_and_description(self, titles):
+        assert self.search('отец') == ['Крёстный отец']
+        assert self.search('драма') == ['Побег из Шоушенка']
+
+    def test_search_tolerates_typos(self, titles):
+        assert self.search('Шоушенко')[0] == 'Побег из Шоушенка'
+
+    def test_index_follows_title_writes(self, titles):
+        titles[2].name = 'Форрест Гамп'
+        titles[2].save()
+        assert self.search('отец') == []
+        assert self.search('Гамп') == ['Форрест Гамп']
+        titles[2].delete()
+        assert self.search('Гамп') == []
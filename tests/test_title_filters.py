@@ -0,0 +1,72 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalogue(category, genres):
+    drama, comedy = genres
+    horror = Genre.objects.create(name='Ужасы', slug='horror')
+    books = Category.objects.create(name='Книга', slug='books')
+    titles = {
+        'Чудо': (category, 2018, [drama, comedy]),
+        'Смех': (category, 2001, [comedy]),
+        'Страх': (books, 2010, [horror, drama]),
+        'Пусто': (books, 1990, []),
+    }
+    for name, (title_category, year, title_genres) in titles.items():
+        title = Title.objects.create(
+            name=name, year=year, category=title_category
+        )
+        title.genre.set(title_genres)
+    return horror
+
+
+def names(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200, response.data
+    return sorted(title['name'] for title in response.data['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleFilters:
+
+    @pytest.mark.parametrize('query, expected', [
+        ('genre=comedy', ['Смех', 'Чудо']),
+        ('genre=drama,comedy', ['Чудо']),
+        ('genre=drama,unknown', []),
+        ('genre_any=comedy,horror', ['Смех', 'Страх', 'Чудо']),
+        ('genre_any=unknown', []),
+        ('category=films,books&year_min=2005', ['Страх', 'Чудо']),
+        ('category=books&genre_any=drama,horror&year_max=2015', ['Страх']),
+        ('genre=drama&year_min=2000&year_max=2012', ['Страх']),
+    ])
+    def test_filters(self, user_client, catalogue, query, expected):
+        assert names(user_client, query) == expected
+
+    def test_genre_ids_follow_genre_changes(self, user_client, catalogue):
+        title = Title.objects.get(name='Пусто')
+        title.genre.add(catalogue)
+        assert names(user_client, 'genre=horror') == ['Пусто', 'Страх']
+
+        catalogue.title_set.remove(title)
+        assert names(user_client, 'genre=horror') == ['Страх']
+
+        catalogue.delete()
+        assert Title.objects.get(name='Страх').genre_ids == [
+            Genre.objects.get(slug='drama').pk
+        ]
+
+    def test_bulk_titles_get_genre_ids(self, admin_client, catalogue):
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'Новое', 'year': 2020, 'category': 'films',
+             'genre': ['horror', 'comedy']},
+        ], format='json')
+        assert response.status_code == 201, response.data
+        assert names(admin_client, 'genre=horror,comedy') == ['Новое']
+
+        response = admin_client.patch('/api/v1/titles/bulk/', data=[
+            {'id': response.data[0]['id'], 'genre': ['drama']},
+        ], format='json')
+        assert response.status_code == 200, response.data
+        assert names(admin_client, 'genre=horror,comedy') == []
@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.serializers import (
+    TitleSerializerRead,
+    represent_title_rows,
+    title_rows,
+)
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles(category, genres):
+    drama, comedy = genres
+    books = Category.objects.create(name='Книга', slug='books')
+    horror = Genre.objects.create(name='Ужасы', slug='horror')
+    another_drama = Genre.objects.create(name='Драма', slug='drama-2')
+    rows = [
+        ('Чудо', category, 'Про чудо', [comedy, drama], (17, 2)),
+        ('Смех', category, None, [comedy], (0, 0)),
+        ('Страх', books, '', [horror, another_drama, drama], (29, 3)),
+        ('Пусто', None, 'Без категории', [], (10, 1)),
+        ('Тихий дом', books, 'Дом', [drama], (7, 3)),
+    ]
+    for name, title_category, description, title_genres, rating in rows:
+        title = Title.objects.create(
+            name=name,
+            year=2000,
+            category=title_category,
+            description=description,
+        )
+        title.genre.set(title_genres)
+        Title.objects.filter(pk=title.pk).update(
+            rating_sum=rating[0], rating_count=rating[1]
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleListFastPath:
+
+    def test_rows_render_as_the_serializer(self, titles):
+        queryset = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).order_by('name')
+        renderer = JSONRenderer()
+        assert renderer.render(
+            represent_title_rows(title_rows(queryset))
+        ) == renderer.render(TitleSerializerRead(queryset, many=True).data)
+
+    @pytest.mark.parametrize('query', [
+        '',
+        '?page=2',
+        '?genre=drama',
+        '?category=books',
+        '?search=дом',
+        '?year=1990',
+    ])
+    def test_same_response_as_the_serializer(self, titles, client,
+                                             settings, query):
+        responses = []
+        for fast in (True, False):
+            settings.TITLE_LIST_FAST_PATH = fast
+            cache.clear()
+            response = client.get(f'/api/v1/titles/{query}')
+            assert response.status_code == 200
+            responses.append(response.content)
+        assert responses[0] == responses[1]
@@ -0,0 +1,69 @@
+import pytest
+
+from reviews.models import Review, Title, TitleStats
+
+
+def histogram(**scores):
+    result = {str(score): 0 for score in range(1, 11)}
+    result.update(scores)
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleStats:
+
+    def test_stats_follow_review_writes(self, user_client, another_user_client,
+                                        title, query_budget):
+        url = f'/api/v1/titles/{title.id}/stats/'
+        response = user_client.get(url)
+        assert response.status_code == 200
+        assert response.data == {
+            'title': title.id, 'count': 0, 'mean': None, 'median': None,
+            'histogram': histogram(),
+        }
+
+        reviews = f'/api/v1/titles/{title.id}/reviews/'
+        review_id = user_client.post(
+            reviews, data={'text': 'Хорошо', 'score': 8}
+        ).data['id']
+        another_user_client.post(reviews, data={'text': 'Плохо', 'score': 3})
+        response = user_client.get(url)
+        assert response.data['histogram'] == histogram(**{'3': 1, '8': 1})
+        assert (response.data['count'], response.data['mean']) == (2, 5.5)
+        assert response.data['median'] == 5.5
+
+        user_client.patch(f'{reviews}{review_id}/', data={'score': 10})
+        assert user_client.get(url).data['histogram'] == histogram(
+            **{'3': 1, '10': 1}
+        )
+
+        user_client.delete(f'{reviews}{review_id}/')
+        with query_budget(2):
+            response = user_client.get(url)
+        assert response.data['histogram'] == histogram(**{'3': 1})
+        assert response.data['median'] == 3
+
+    def test_missing_row_is_rebuilt_from_reviews(self, user, another_user,
+                                                 user_client, title):
+        Review.objects.create(title=title, author=user, text='А', score=7)
+        Review.objects.create(title=title, author=another_user, text='Б', score=9)
+        TitleStats.objects.all().delete()
+
+        response = user_client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.data['histogram'] == histogram(**{'7': 1, '9': 1})
+        assert response.data['median'] == 8
+
+    def test_deleted_title_leaves_no_stats(self, user, title):
+        Review.objects.create(title=title, author=user, text='А', score=7)
+        Title.objects.filter(pk=title.pk).delete()
+        assert not TitleStats.objects.exists()
+
+    @pytest.mark.parametrize('title_id', ['999', 'abc'])
+    def test_unknown_title(self, user_client, title_id):
+        response = user_client.get(f'/api/v1/titles/{title_id}/stats/')
+        assert response.status_code == 404
+
+    def test_fresh_copy_is_not_modified(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/stats/'
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitlesBulk:
+
+    url = '/api/v1/titles/bulk/'
+
+    def titles_data(self, count):
+        return [
+            {'name': f'Фильм {i}', 'year': 2000 + i, 'category': 'films',
+             'genre': ['drama', 'comedy']}
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self, admin_client, category, genres):
+        response = admin_client.post(self.url, data=self.titles_data(20), format='json')
+        assert response.status_code == 201, response.data
+        assert len(response.data) == 20
+        assert response.data[0]['genre'] == ['drama', 'comedy']
+        assert response.data[0]['category'] == 'films'
+        assert Title.objects.count() == 20
+        assert Title.genre.through.objects.count() == 40
+
+    def test_bulk_create_query_budget(self, admin_client, category, genres,
+                                      django_assert_max_num_queries):
+        if not connection.features.can_return_ids_from_bulk_insert:
+            pytest.skip('Titles are saved one by one on this database')
+        with django_assert_max_num_queries(10):
+            response = admin_client.post(self.url, data=self.titles_data(100), format='json')
+        assert response.status_code == 201, response.data
+
+    def test_bulk_create_reports_errors_per_item(self, admin_client, category, genres):
+        data = [
+            {'name': 'Фильм', 'year': 2000, 'category': 'films', 'genre': ['drama']},
+            {'name': 'Фильм', 'year': 2000, 'category': 'books', 'genre': ['drama']},
+            {'name': 'Фильм', 'year': 3000, 'category': 'films', 'genre': ['horror']},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert set(response.data[1]) == {'category'}
+        assert set(response.data[2]) == {'year'}
+        assert not Title.objects.exists()
+
+    def test_bulk_update(self, admin_client, title, genres):
+        data = [{'id': title.id, 'year': 2001, 'genre': ['comedy']}]
+        response = admin_client.patch(self.url, data=data, format='json')
+        assert response.status_code == 200, response.data
+        title.refresh_from_db()
+        assert title.year == 2001
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+        assert response.data[0]['genre'] == ['comedy']
+        assert response.data[0]['name'] == title.name
+
+    def test_bulk_update_unknown_id(self, admin_client, title):
+        response = admin_client.patch(self.url, data=[{'id': 0, 'year': 2001}], format='json')
+        assert response.status_code == 400
+        assert 'id' in response.data[0]
+
+    def test_bulk_requires_admin(self, user_client, category):
+        response = user_client.post(self.url, data=[], format='json')
+        assert response.status_code == 403
@@ -0,0 +1,130 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from reviews import references
+from reviews.models import (
+    RANKING_PRIOR_KEY,
+    Category,
+    Review,
+    Title,
+    TitleRank,
+)
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(5)
+    ]
+
+
+@pytest.fixture
+def rated(title, genres, authors):
+    """'Чудо' has one 10, 'Смех' five 8, 'Тишина' five 3, 'Пусто' none.
+
+    Ranked again with the mean of all reviews as the prior.
+    """
+    _, comedy = genres
+    books = Category.objects.create(name='Книга', slug='books')
+    laugh = Title.objects.create(name='Смех', year=1999, category=books)
+    laugh.genre.set([comedy])
+    silence = Title.objects.create(name='Тишина', year=2000, category=books)
+    Title.objects.create(name='Пусто', year=2000, category=books)
+    Review.objects.create(title=title, author=authors[0], text='А', score=10)
+    for author in authors:
+        Review.objects.create(title=laugh, author=author, text='Б', score=8)
+        Review.objects.create(title=silence, author=author, text='В', score=3)
+    TitleRank.objects.rebuild()
+    return title, laugh, silence
+
+
+def bayesian(settings, prior, total, count):
+    weight = settings.RANKING_PRIOR_WEIGHT
+    return (weight * prior + total) / (weight + count)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTopTitles:
+
+    def test_count_weighted_order(self, rated, client, settings):
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        assert response.data['count'] == 3
+        results = response.data['results']
+        assert [item['name'] for item in results] == [
+            'Смех', 'Чудо', 'Тишина'
+        ]
+        assert results[0]['score'] == round(
+            bayesian(settings, 65 / 11, 40, 5), 2
+        )
+        assert results[0]['genre'] == [{'name': 'Комедия', 'slug': 'comedy'}]
+        assert results[1]['rating'] == 10
+
+    @pytest.mark.parametrize('query, names', [
+        ('?category=films', ['Чудо']),
+        ('?category=books', ['Смех', 'Тишина']),
+        ('?category=books,films', ['Смех', 'Чудо', 'Тишина']),
+        ('?genre=drama', ['Чудо']),
+        ('?genre_any=drama,comedy', ['Смех', 'Чудо']),
+        ('?year=1999', ['Смех']),
+        ('?year_min=2000', ['Чудо', 'Тишина']),
+        ('?category=unknown', []),
+    ])
+    def test_filters(self, rated, client, query, names):
+        response = client.get(f'/api/v1/titles/top/{query}')
+        assert [item['name'] for item in response.data['results']] == names
+
+    def test_ranks_follow_title_writes(self, rated, admin_client, genres):
+        title, laugh, _ = rated
+        drama, _ = genres
+        response = admin_client.patch(
+            f'/api/v1/titles/{laugh.id}/',
+            data={'category': 'films', 'year': 2001, 'genre': ['drama']},
+        )
+        assert response.status_code == 200
+        rank = TitleRank.objects.get(title=laugh)
+        assert (rank.category_id, rank.year, rank.genre_ids) == (
+            title.category_id, 2001, [drama.pk]
+        )
+        Category.objects.filter(slug='films').delete()
+        assert TitleRank.objects.get(title=laugh).category_id is None
+
+    def test_new_reviews_are_ranked_with_the_prior(self, rated, user,
+                                                   settings):
+        title, _, silence = rated
+        Review.objects.create(title=title, author=user, text='Г', score=2)
+        assert TitleRank.objects.get(title=title).score == pytest.approx(
+            bayesian(settings, 65 / 11, 12, 2)
+        )
+        Review.objects.filter(title=silence).delete()
+        assert not TitleRank.objects.filter(title=silence).exists()
+
+    def test_unrated_titles_leave_the_leaderboard(self, rated, client):
+        title, laugh, silence = rated
+        Review.objects.filter(title=title).delete()
+        laugh.delete()
+        silence.delete()
+        assert not TitleRank.objects.exists()
+        assert client.get('/api/v1/titles/top/').data['count'] == 0
+
+    def test_reconcile_rebuilds_with_a_new_prior(self, rated, settings):
+        title, laugh, _ = rated
+        Title.objects.filter(pk=title.pk).update(rating_sum=0)
+        TitleRank.objects.update(score=0)
+        call_command('reconcile_ratings')
+        assert cache.get(RANKING_PRIOR_KEY) == 65 / 11
+        assert TitleRank.objects.get(title=laugh).score == pytest.approx(
+            bayesian(settings, 65 / 11, 40, 5)
+        )
+        assert not TitleRank.objects.filter(score=0).exists()
+
+    def test_page_is_two_queries(self, rated, client,
+                                 django_assert_num_queries):
+        references.load()
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/top/?genre=comedy')
+        assert response.data['results'][0]['id'] == rated[1].id
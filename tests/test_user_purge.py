@@ -0,0 +1,172 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title, TitleRank, TitleStats
+from users.management.commands import purge_deleted_users
+from users.models import User
+
+
+@pytest.fixture
+def titles(title, category):
+    return [title, Title.objects.create(name='Смех', year=2000, category=category)]
+
+
+@pytest.fixture
+def activity(user, another_user, titles):
+    """'user' reviews both titles and comments, 'another_user' answers."""
+    for title, score in zip(titles, (9, 4)):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=score
+        )
+        for author in (user, another_user, another_user):
+            Comment.objects.create(review=review, author=author, text='Да')
+    review = Review.objects.create(
+        title=titles[0], author=another_user, text='Другой', score=6
+    )
+    Comment.objects.create(review=review, author=user, text='Нет')
+    return review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserSoftDelete:
+
+    def test_deleted_user_is_hidden(self, admin_client, user, user_client,
+                                    activity, titles):
+        user_client.get('/api/v1/users/me/')
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        user.refresh_from_db()
+        assert not user.is_active and user.deleted_at is not None
+        assert Review.objects.filter(author=user).count() == 2
+
+        url = f'/api/v1/users/{user.username}/'
+        assert admin_client.get(url).status_code == 404
+        assert [
+            item['username']
+            for item in admin_client.get('/api/v1/users/').data['results']
+        ] == ['TestAdmin', 'TestUserAnother']
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+        reviews = admin_client.get(
+            f'/api/v1/titles/{titles[0].id}/reviews/'
+        ).data['results']
+        assert [review['author'] for review in reviews] == ['TestUserAnother']
+        comments = admin_client.get(
+            f'/api/v1/titles/{titles[0].id}/reviews/{activity.id}/comments/'
+        ).data['results']
+        assert comments == []
+        response = admin_client.post('/api/v1/auth/signup/', data={
+            'username': user.username, 'email': user.email,
+        })
+        assert response.status_code == 400
+
+    def test_scores_leave_the_rating_at_once(self, admin_client, user,
+                                             activity, titles):
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = admin_client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert response.data['rating'] == 6
+        stats = admin_client.get(f'/api/v1/titles/{titles[0].id}/stats/')
+        assert stats.data['count'] == 1
+        top = admin_client.get('/api/v1/titles/top/').data['results']
+        assert [item['id'] for item in top] == [titles[0].id]
+        assert not Title.objects.with_rating_drift().exists()
+        user.soft_delete()
+        titles[1].refresh_from_db()
+        assert (titles[1].rating_sum, titles[1].rating_count) == (0, 0)
+
+    def test_restore_brings_the_scores_back(self, user, activity, titles):
+        user.soft_delete()
+        user.restore()
+        user.refresh_from_db()
+        assert user.is_active and user.deleted_at is None
+        titles[0].refresh_from_db()
+        assert (titles[0].rating_sum, titles[0].rating_count) == (15, 2)
+        assert TitleStats.objects.get(title=titles[0]).histogram[9] == 1
+        assert not Title.objects.with_rating_drift().exists()
+
+    def test_reviews_edited_while_deleted_are_restored_once(self, user,
+                                                             activity,
+                                                             titles):
+        user.soft_delete()
+        review = Review.objects.get(author=user, title=titles[1])
+        review.score = 6
+        review.save()
+        titles[1].refresh_from_db()
+        assert (titles[1].rating_sum, titles[1].rating_count) == (0, 0)
+        user.restore()
+        titles[1].refresh_from_db()
+        assert (titles[1].rating_sum, titles[1].rating_count) == (6, 1)
+        histogram = TitleStats.objects.get(title=titles[1]).histogram
+        assert (histogram[4], histogram[6]) == (0, 1)
+        assert not Title.objects.with_rating_drift().exists()
+
+    @pytest.mark.parametrize('soft_deleted', [False, True])
+    def test_hard_delete_reads_the_author_once(self, user, activity, titles,
+                                               soft_deleted):
+        if soft_deleted:
+            user.soft_delete()
+        with CaptureQueriesContext(connection) as queries:
+            user.delete()
+        assert not [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "users_user"' in query['sql']
+        ]
+        titles[0].refresh_from_db()
+        assert (titles[0].rating_sum, titles[0].rating_count) == (6, 1)
+        assert TitleStats.objects.get(title=titles[0]).histogram[9] == 0
+        assert not Title.objects.with_rating_drift().exists()
+
+    def test_deactivated_authors_stay_visible(self, admin_client, user,
+                                              activity, titles):
+        user.is_active = False
+        user.save()
+        reviews = admin_client.get(
+            f'/api/v1/titles/{titles[0].id}/reviews/'
+        ).data['results']
+        assert len(reviews) == 2
+        titles[0].refresh_from_db()
+        assert (titles[0].rating_sum, titles[0].rating_count) == (15, 2)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPurgeDeletedUsers:
+
+    def test_rows_and_aggregates(self, user, another_user, activity, titles):
+        user.soft_delete()
+        call_command('purge_deleted_users', '--once', '--batch-size', '2')
+
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert list(Review.objects.all()) == [activity]
+        assert Comment.objects.count() == 0
+        assert not Title.objects.with_rating_drift().exists()
+        assert TitleStats.objects.get(title=titles[0]).histogram[6] == 1
+        assert TitleStats.objects.get(title=titles[0]).histogram[9] == 0
+        assert list(
+            TitleRank.objects.values_list('title_id', 'rating_count')
+        ) == [(titles[0].id, 1)]
+
+    @pytest.mark.parametrize('option', ['--rate', '--batch-size'])
+    def test_limits_must_be_positive(self, option):
+        with pytest.raises(CommandError):
+            call_command('purge_deleted_users', '--once', option, '0')
+
+    def test_active_users_are_kept(self, user, activity):
+        call_command('purge_deleted_users', '--once')
+        assert User.objects.filter(pk=user.pk).exists()
+        assert Review.objects.count() == 3
+
+    def test_write_rate_is_throttled(self, user, activity, monkeypatch):
+        delays = []
+        monkeypatch.setattr(
+            purge_deleted_users.time, 'sleep', delays.append
+        )
+        user.soft_delete()
+        call_command(
+            'purge_deleted_users', '--once', '--batch-size', '2',
+            '--rate', '4',
+        )
+        # 3 own comments, 4 answers and 2 reviews in batches of 2.
+        assert len(delays) == 5
+        assert all(0 < delay <= 0.5 for delay in delays)
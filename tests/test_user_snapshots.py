@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserSnapshots:
+
+    def test_authenticated_read_skips_users_table(self, user_client, title,
+                                                  django_assert_num_queries):
+        user_client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+
+    def test_role_change_applies_to_next_request(self, user, user_client, admin_client):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200
+
+    def test_deactivated_user_is_rejected(self, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_users_me_keeps_password(self, user, user_client):
+        user_client.get('/api/v1/users/me/')
+        response = user_client.patch('/api/v1/users/me/', data={'bio': 'Новое'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'Новое'
+        assert user.check_password('1234567')
+        assert user_client.get('/api/v1/users/me/').data['bio'] == 'Новое'
@@ -0,0 +1,68 @@
+import runpy
+from os.path import join
+from types import SimpleNamespace
+
+import pytest
+from rest_framework.test import APIClient
+
+from api_yamdb import warmup
+from .conftest import root_dir
+
+
+@pytest.mark.django_db
+class TestWarmup:
+
+    def test_every_step_runs(self, category, genres):
+        report = warmup.warm_up()
+        assert [step for step, _, _ in report] == [
+            'routes', 'serializers', 'caches'
+        ]
+        assert all(items > 0 for _, items, _ in report)
+
+    def test_title_lists_are_cached(self, title, django_assert_num_queries):
+        warmup.prime_caches()
+        client = APIClient()
+        with django_assert_num_queries(0):
+            for url in warmup.CACHED_URLS:
+                assert client.get(url).status_code == 200
+
+    def test_failed_step_does_not_stop_warmup(self, monkeypatch):
+        def broken():
+            raise RuntimeError
+
+        monkeypatch.setattr(
+            warmup, 'STEPS', (('broken', broken), warmup.STEPS[0])
+        )
+        report = warmup.warm_up()
+        assert [(step, items > 0) for step, items, _ in report] == [
+            ('broken', False), ('routes', True)
+        ]
+
+
+class TestGunicornConfig:
+
+    def test_application_is_preloaded(self):
+        config = runpy.run_path(
+            join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+        )
+        assert config['preload_app'] is True
+        assert config['bind'] == '0:8000'
+        assert callable(config['when_ready'])
+
+    @pytest.mark.parametrize('workers, backend, refused', [
+        (3, 'django.core.cache.backends.locmem.LocMemCache', True),
+        (1, 'django.core.cache.backends.locmem.LocMemCache', False),
+        (3, 'django.core.cache.backends.memcached.MemcachedCache', False),
+    ])
+    def test_local_cache_needs_one_worker(self, settings, workers, backend,
+                                          refused):
+        config = runpy.run_path(
+            join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+        )
+        settings.CACHES = {'default': {'BACKEND': backend}}
+        server = SimpleNamespace(cfg=SimpleNamespace(workers=workers))
+        if refused:
+            with pytest.raises(RuntimeError):
+                config['on_starting'](server)
+        else:
+            config['on_starting'](server)